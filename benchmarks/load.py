@@ -0,0 +1,143 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+from tornado.websocket import websocket_connect
+
+from cpi.proxy import HEALTH_PATH, STREAM_PATH
+
+# ===================
+# בדיקת עומס: python -m benchmarks.load --workers 1 2 4
+# ===================
+# לכל מספר עובדים מריץ את cpi/proxy.py, פותח --sessions סשנים במקביל דרך
+# ה-proxy (websocket כמו של הדפדפן) ובכל סשן מבקש --runs ריצות מחדש של הסקריפט
+# ומחכה לסיום כל אחת. מדווח ריצות לשנייה והשהיה (חציון ו-p95) לכל מספר עובדים,
+# ואת ההאצה ביחס לעובד אחד; התוצאות נכתבות ל-build/benchmarks/load.json.
+# ההאצה חסומה במספר הליבות של המכונה (מודפס בדוח).
+
+RESULTS_DIR = Path("build/benchmarks")
+READY_TIMEOUT = 120.0
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rerun_message(query_string=""):
+    msg = BackMsg()
+    msg.rerun_script.query_string = query_string
+    msg.rerun_script.page_script_hash = ""
+    return msg.SerializeToString()
+
+
+async def wait_ready(port, workers):
+    client = AsyncHTTPClient()
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            response = await client.fetch(f"http://127.0.0.1:{port}{HEALTH_PATH}?workers", request_timeout=2)
+            if sum(w["ready"] for w in json.loads(response.body)) == workers:
+                return
+        except (HTTPClientError, OSError, ValueError):
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError(f"proxy on port {port}: workers not ready after {READY_TIMEOUT:.0f}s")
+
+
+async def session(port, runs, latencies):
+    # סשן אחד: הריצה הראשונה נפתחת בחיבור, כל ריצה נגמרת ב-script_finished
+    connection = await websocket_connect(f"ws://127.0.0.1:{port}{STREAM_PATH}", subprotocols=["streamlit"])
+    try:
+        for i in range(runs + 1):
+            started = time.perf_counter()
+            await connection.write_message(rerun_message(), binary=True)
+            while True:
+                message = await connection.read_message()
+                if message is None:
+                    raise ConnectionError("session closed before the run finished")
+                forward = ForwardMsg()
+                forward.ParseFromString(message)
+                if forward.WhichOneof("type") == "script_finished":
+                    break
+            # הריצה הראשונה בכל סשן (יצירת הסשן) לא נמדדת
+            if i:
+                latencies.append(time.perf_counter() - started)
+    finally:
+        connection.close()
+
+
+async def load(port, sessions, runs):
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(session(port, runs, latencies) for _ in range(sessions)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "runs": len(latencies),
+        "seconds": elapsed,
+        "runs_per_second": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+def measure(workers, sessions, runs):
+    port = free_port()
+    env = {**os.environ, "CPI_WATCH": "off"}
+    env.pop("CPI_METRICS_PORT", None)
+    proxy = subprocess.Popen(
+        [sys.executable, "-m", "cpi.proxy", "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1",
+         "--base-port", str(free_port() + 1000)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        asyncio.run(wait_ready(port, workers))
+        # סבב חימום כדי שכל עובד יבנה את המטמונים שלו לפני המדידה
+        asyncio.run(load(port, workers, 1))
+        return asyncio.run(load(port, sessions, runs))
+    finally:
+        proxy.terminate()
+        proxy.wait(timeout=30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure dashboard throughput through cpi.proxy by worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--sessions", type=int, default=16, help="concurrent browser sessions")
+    parser.add_argument("--runs", type=int, default=5, help="script reruns per session")
+    parser.add_argument("--output", default=str(RESULTS_DIR / "load.json"))
+    args = parser.parse_args(argv)
+
+    cores = os.cpu_count()
+    print(f"{cores} CPU cores, {args.sessions} sessions x {args.runs} runs")
+    results = {"cores": cores, "sessions": args.sessions, "runs": args.runs, "workers": {}}
+    base = None
+    for workers in args.workers:
+        result = measure(workers, args.sessions, args.runs)
+        base = base or result["runs_per_second"]
+        result["speedup"] = result["runs_per_second"] / base
+        results["workers"][str(workers)] = result
+        print(f"  {workers:>2} workers  {result['runs_per_second']:7.1f} runs/s  "
+              f"p50 {result['p50'] * 1000:7.1f} ms  p95 {result['p95'] * 1000:7.1f} ms  x{result['speedup']:.2f}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import gc
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic import generate
+from cpi.store import DATA_DIR, build_store, discover_series_files, load_snapshot, save_snapshot
+
+# ===================
+# דוח זיכרון: python -m benchmarks.memory
+# ===================
+# משווה את ה-RSS שתהליך מוסיף כדי להחזיק את כל הסדרות בשלושה מודלים, כל אחד
+# בתהליך נפרד ונקי:
+#   json_dicts       המודל הקודם - רשימת מילונים לכל קובץ, ועותק pickle כמו ש-st.cache_data החזיק
+#   store_json       המערך העמודתי, נבנה מקבצי ה-JSON
+#   store_snapshot   אותו מערך ממופה מתמונת המצב (אחרי קריאה של כל הערכים)
+# עם --series הדוח רץ גם על עותק סינתטי של data/ בגודל הזה.
+
+RESULTS_DIR = Path("build/benchmarks")
+SCENARIOS = ("json_dicts", "store_json", "store_snapshot")
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # שיא ה-RSS: KB בלינוקס, בתים ב-macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def hold(scenario, data_dir, snapshot_path):
+    if scenario == "json_dicts":
+        series = []
+        for path in discover_series_files(data_dir):
+            with open(path, "r", encoding="utf-8") as f:
+                series.append(json.load(f))
+        return series, pickle.dumps(series)
+    if scenario == "store_json":
+        return build_store(data_dir)
+    store = load_snapshot(snapshot_path)
+    # הדפים של קובץ ממופה נטענים רק כשקוראים אותם
+    float(np.nansum(store.values))
+    return store
+
+
+def measure(scenario, data_dir, snapshot_path):
+    # רץ בתהליך הילד: RSS אחרי הייבואים, ואז אחרי שהנתונים מוחזקים בזיכרון
+    gc.collect()
+    before = rss_bytes()
+    held = hold(scenario, data_dir, snapshot_path)
+    gc.collect()
+    after = rss_bytes()
+    del held
+    return {"before": before, "after": after, "held": after - before}
+
+
+def run_scenario(scenario, data_dir, snapshot_path):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.memory", "--child", scenario,
+         "--data-dir", str(data_dir), "--snapshot", str(snapshot_path)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def report(data_dir):
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = Path(tmp) / "cpi_snapshot.bin"
+        store = build_store(data_dir)
+        save_snapshot(store, snapshot_path)
+        results = {scenario: run_scenario(scenario, data_dir, snapshot_path) for scenario in SCENARIOS}
+    return {"series": len(store), "months": len(store.periods), "values_bytes": store.values.nbytes, "scenarios": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the RSS of the old dict records and the compact store")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--series", type=int, help="also report on a synthetic copy of data/ with this many series")
+    parser.add_argument("--output", default=str(RESULTS_DIR / "memory.json"))
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--snapshot", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.data_dir, args.snapshot)))
+        return
+
+    results = {"shipped": report(args.data_dir)}
+    if args.series:
+        with tempfile.TemporaryDirectory() as tmp:
+            generate(Path(tmp) / "data", args.series, args.data_dir)
+            results["synthetic"] = report(Path(tmp) / "data")
+
+    for dataset, result in results.items():
+        print(f"{dataset}: {result['series']} series x {result['months']} months, "
+              f"values array {result['values_bytes'] / 2 ** 20:.2f} MB")
+        baseline = result["scenarios"]["json_dicts"]["held"]
+        for scenario, measured in result["scenarios"].items():
+            ratio = f"   x{baseline / measured['held']:.1f} smaller" if scenario != "json_dicts" and measured["held"] > 0 else ""
+            print(f"  {scenario:<16} +{measured['held'] / 2 ** 20:8.2f} MB RSS{ratio}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
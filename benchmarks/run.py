@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# app.py מעלה את חוט הטעינה מחדש; במדידה ה-store מוצמד ידנית
+os.environ.setdefault("CPI_WATCH", "off")
+
+from benchmarks.synthetic import generate
+from cpi.cache import invalidate
+from cpi.charts import CHARTS, figure_spec
+from cpi.dashboard import get_calculated_contributions, get_top_selected_consumption_items, load_table_data
+from cpi.snapshot import source_hash
+from cpi.store import DATA_DIR, build_store, load_snapshot, save_snapshot, set_watched, swap_store
+from cpi.summary import load_summary, pin_summary, save_summary
+
+# ===================
+# מדידת הנתיבים החמים: python -m benchmarks.run
+# ===================
+# מודד את הפונקציות האמיתיות קר (אחרי ריקון המטמון) וחם (מהמטמון): טעינת
+# הנתונים מ-JSON ומתמונת מצב, חישובי הדשבורד, שלושת הגרפים וריצה מלאה של
+# app.py דרך AppTest. כל מדידה רצה על data/ ועל עותק סינתטי עם --series סדרות.
+# התוצאות נכתבות ל-JSON; עם --baseline כל מדידה שהחציון שלה איטי מהבסיס ביותר
+# מ---threshold נחשבת נסיגה וקוד היציאה הוא 1.
+#   python -m benchmarks.run --save-baseline     על הענף הראשי
+#   python -m benchmarks.run                     על השינוי, משווה לבסיס
+
+RESULTS_DIR = Path("build/benchmarks")
+APP_SCRIPT = "app.py"
+DATASETS = ("shipped", "synthetic")
+DEFAULT_THRESHOLD = 0.25
+# הפרשים קטנים מזה (שליפות מטמון של מיקרו-שניות) הם רעש ולא נסיגה
+MIN_REGRESSION_SECONDS = 0.0005
+
+
+def run_app(timeout=60):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=timeout)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{APP_SCRIPT} raised: {at.exception[0].message}")
+
+
+def benchmark_cases(data_dir, snapshot_path, app=True):
+    # (שם, פונקציה של store, האם יש מצב חם); מדידה בלי מצב חם מדווחת רק cold
+    cases = [
+        ("load_json", lambda store: build_store(data_dir), False),
+        ("load_snapshot", lambda store: load_snapshot(snapshot_path), False),
+        ("get_calculated_contributions", get_calculated_contributions, True),
+        ("get_top_selected_consumption_items", get_top_selected_consumption_items, True),
+        ("load_table_data", load_table_data, True),
+    ]
+    for name in CHARTS:
+        cases.append((f"chart.{name}", lambda store, name=name: figure_spec(store, name), True))
+    if app:
+        cases.append(("app_run", lambda store: run_app(), True))
+    return cases
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def measure(fn, store, repeat, warm):
+    # ריצה ראשונה שלא נספרת: "קר" הוא מטמון ריק, לא אתחול חד-פעמי של התהליך
+    # (ייבוא, הסריאלייזר של plotly), שאחרת נזקף רק למדידה שרצה ראשונה
+    fn(store)
+    cold_runs = []
+    for _ in range(repeat):
+        invalidate()
+        cold_runs.append(_timed(lambda: fn(store)))
+    result = {"cold": statistics.median(cold_runs), "cold_runs": cold_runs}
+    if warm:
+        fn(store)
+        warm_runs = [_timed(lambda: fn(store)) for _ in range(repeat)]
+        result.update(warm=statistics.median(warm_runs), warm_runs=warm_runs)
+    return result
+
+
+def run_dataset(data_dir, repeat, app=True, only=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = Path(tmp) / "cpi_snapshot.bin"
+        store = build_store(data_dir, source_hash(data_dir))
+        save_snapshot(store, snapshot_path)
+        summary_path = Path(tmp) / "cpi_summary.json"
+        save_summary(store, summary_path, data_dir, snapshot_path)
+        # כל הריצות (כולל AppTest, שרץ בתהליך הזה) רואות את ה-store הזה ואת התקציר
+        # שנבנה ממנו, ולא טוענות את data/ או את build/cpi_summary.json
+        swap_store(store)
+        set_watched(True)
+        pin_summary(load_summary(summary_path))
+        results = {}
+        try:
+            for name, fn, warm in benchmark_cases(data_dir, snapshot_path, app):
+                if only and not any(pattern in name for pattern in only):
+                    continue
+                results[name] = measure(fn, store, repeat, warm)
+                warm_text = f"   warm {results[name]['warm'] * 1000:9.3f} ms" if warm else ""
+                print(f"  {name:<36} cold {results[name]['cold'] * 1000:9.2f} ms{warm_text}", flush=True)
+        finally:
+            pin_summary(None)
+    return {"series": len(store), "months": len(store.periods), "cases": results}
+
+
+def compare(results, baseline, threshold):
+    # [(מדידה, שלב, בסיס, עכשיו)] לכל חציון שעבר את הסף
+    regressions = []
+    for dataset, current in results["datasets"].items():
+        base = baseline.get("datasets", {}).get(dataset)
+        if base is None or base["series"] != current["series"]:
+            continue
+        for name, timings in current["cases"].items():
+            for phase in ("cold", "warm"):
+                before = base["cases"].get(name, {}).get(phase)
+                after = timings.get(phase)
+                if before is None or after is None:
+                    continue
+                if after > before * (1 + threshold) and after - before > MIN_REGRESSION_SECONDS:
+                    regressions.append((f"{dataset}/{name}", phase, before, after))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the dashboard's hot paths cold and warm")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--datasets", nargs="+", choices=DATASETS, default=list(DATASETS))
+    parser.add_argument("--series", type=int, default=5000, help="series in the synthetic dataset")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per phase; the median is reported")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run only cases whose name contains NAME")
+    parser.add_argument("--no-app", action="store_true", help="skip the full AppTest run")
+    parser.add_argument("--output", default=str(RESULTS_DIR / "results.json"))
+    parser.add_argument("--baseline", default=str(RESULTS_DIR / "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": args.repeat,
+        "datasets": {},
+    }
+    for dataset in args.datasets:
+        if dataset == "shipped":
+            print(f"{dataset}: {args.data_dir}", flush=True)
+            results["datasets"][dataset] = run_dataset(args.data_dir, args.repeat, not args.no_app, args.only)
+            continue
+        with tempfile.TemporaryDirectory() as tmp:
+            count = generate(Path(tmp) / "data", args.series, args.data_dir)
+            print(f"{dataset}: {count} series", flush=True)
+            results["datasets"][dataset] = run_dataset(Path(tmp) / "data", args.repeat, not args.no_app, args.only)
+
+    output = Path(args.baseline if args.save_baseline else args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {output}")
+    if args.save_baseline or not Path(args.baseline).exists():
+        return
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for name, phase, before, after in regressions:
+        print(f"REGRESSION {name} {phase}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms (+{after / before - 1:.0%})")
+    if regressions:
+        sys.exit(1)
+    print(f"no regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
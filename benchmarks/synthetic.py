@@ -0,0 +1,70 @@
+import json
+import random
+import shutil
+from pathlib import Path
+
+from cpi.classification import CLASSIFICATION_NAME
+from cpi.store import CLASSIFICATION_DIR, DATA_DIR, SERIES_DIRS
+
+# ===================
+# נתונים סינתטיים בקנה מידה גדול
+# ===================
+# עותק של data/ שבו קבוצות העלים משוכפלות עד שיש series סדרות בסך הכל. כל
+# עותק מקבל קוד חדש (מ-SYNTHETIC_FIRST_CODE), ערכים מוזזים מעט ורשומת עלה בקובץ
+# הסיווג תחת אותו הורה, כך שגם חישובי התרומות והסעיפים הנבחרים גדלים עם הנתונים.
+
+SYNTHETIC_FIRST_CODE = 900000
+
+
+def _jitter(series, factor):
+    records = []
+    for r in series["data"]:
+        record = dict(r)
+        for field in ("value", "index_relative_to_2024_avg"):
+            if record.get(field) is not None:
+                record[field] = round(record[field] * factor, 2)
+        for field in ("monthly_change", "yearly_change", "contribution"):
+            if record.get(field) is not None:
+                record[field] = round(record[field] * factor, 3)
+        records.append(record)
+    return records
+
+
+def generate(output_dir, series=5000, data_dir=DATA_DIR, seed=0):
+    # מחזיר את מספר הסדרות שנכתבו
+    data_dir, output_dir = Path(data_dir), Path(output_dir)
+    rng = random.Random(seed)
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    shutil.copytree(data_dir / CLASSIFICATION_DIR, output_dir / CLASSIFICATION_DIR)
+    count = 0
+    for sub in SERIES_DIRS:
+        shutil.copytree(data_dir / sub, output_dir / sub)
+        count += len(list((output_dir / sub).glob("cpi_*.json")))
+
+    classification_path = output_dir / CLASSIFICATION_DIR / f"{CLASSIFICATION_NAME}.json"
+    with open(classification_path, "r", encoding="utf-8") as f:
+        classification = json.load(f)
+    leaves = [item for item in classification["data"] if item.get("has_children") == 0]
+    templates = []
+    for item in leaves:
+        path = next((data_dir / "groups").glob(f"cpi_{item['group_code']}_*.json"), None)
+        if path is not None:
+            with open(path, "r", encoding="utf-8") as f:
+                templates.append((item, json.load(f)))
+
+    code = SYNTHETIC_FIRST_CODE
+    while count < series and templates:
+        item, template = templates[(code - SYNTHETIC_FIRST_CODE) % len(templates)]
+        factor = rng.uniform(0.5, 1.5)
+        name = f"{template['name']} ({code})"
+        data = dict(template, index_id=code, name=name, data=_jitter(template, factor))
+        with open(output_dir / "groups" / f"cpi_{code}_synthetic.json", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        classification["data"].append(dict(item, group_code=code, group_name=name, sibling_codes=[]))
+        code += 1
+        count += 1
+
+    with open(classification_path, "w", encoding="utf-8") as f:
+        json.dump(classification, f, ensure_ascii=False)
+    return count
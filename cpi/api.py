@@ -0,0 +1,243 @@
+import gzip
+import hashlib
+import math
+from pathlib import Path
+
+from cpi.cache import versioned
+from cpi.dashboard import get_calculated_contributions, get_top_selected_consumption_items, load_main_index
+from cpi.files import write_atomic
+from cpi.models import dumps, freeze
+from cpi.store import FIELDS
+from cpi.trends import get_core_trend
+
+# ===================
+# 🤖 ה-API / מבנה הנתונים ל-LLM
+# ===================
+# static/api.json נבנה פעם אחת לכל גרסת נתונים בשלב הבנייה (python -m cpi.build),
+# נכתב בהחלפה אטומית ולצידו api.json.gz ו-api.json.sha256. סקריפט ה-UI רק
+# קורא את המחרוזות השמורות במטמון ולא כותב לדיסק.
+
+STATIC_DIR = Path("static")
+API_NAME = "api.json"
+
+
+@versioned
+def build_machine_ready_data(store):
+    main_records = load_main_index(store).records()
+    latest_record = main_records[0]
+    core_trend = get_core_trend(store)
+    return freeze({
+        "dashboard_metadata": {
+            "title": "מדד המחירים לצרכן - דשבורד",
+            "description": "דשבורד המציג את נתוני מדד המחירים לצרכן בישראל, כולל מגמות, תרומות של סעיפים מרכזיים, ושינויים היסטוריים.",
+            "report_date": f"{latest_record.get('month')}/{latest_record.get('year')}",
+            "base_index": "ממוצע 2024 = 100"
+        },
+        "key_metrics": {
+            "monthly_change_percent": latest_record.get('monthly_change'),
+            "yearly_change_percent": latest_record.get('yearly_change'),
+            "current_index_level": latest_record.get('index_relative_to_2024_avg'),
+            "core_trend_without_housing_percent": core_trend.without_housing if core_trend else None,
+            "core_trend_without_housing_vegetables_fruits_percent": core_trend.without_housing_fruit_vegetables if core_trend else None,
+            "core_trend_period": core_trend.period if core_trend else None
+        },
+        "charts_data": {
+            "monthly_changes_13_months": [
+                {
+                    "month": d.get("month"),
+                    "year": d.get("year"),
+                    "monthly_change_percent": d.get("monthly_change")
+                }
+                for d in main_records[:13]
+            ],
+            "top_contributions_to_monthly_change": get_calculated_contributions(store),
+            "time_series_26_months": [
+                {
+                    "month": d.get("month"),
+                    "year": d.get("year"),
+                    "index_level": d.get("index_relative_to_2024_avg"),
+                    "seasonally_adjusted": d.get("seasonally_adjusted")
+                }
+                for d in main_records[:26]
+            ],
+            "top_price_changes_in_selected_items": get_top_selected_consumption_items(store)
+        }
+    })
+
+
+# הסריאליזציות נשמרות כמחרוזות - אין צורך להעתיק את המבנה בכל ריצה
+@versioned
+def get_api_json(store):
+    return dumps(build_machine_ready_data(store), ensure_ascii=True, indent=2)
+
+
+@versioned
+def get_json_ld(store):
+    return dumps(build_machine_ready_data(store), ensure_ascii=False, indent=2)
+
+
+@versioned
+def get_api_body(store):
+    return dumps(build_machine_ready_data(store))
+
+
+# ===================
+# שאילתות ?api=...
+# ===================
+#   ?api=true                                         מבנה machine_ready_data המלא
+#   ?api=group&code=120040[&month=2025-10]            רשומה של קוד בחודש (ברירת מחדל: האחרון)
+#   ?api=series&code=120040[&from=2024-01][&to=2025-06]  סדרה של קוד בטווח חודשים
+#   ?api=level&level=2[&month=2025-10]                כל הקבוצות ברמה בעץ הסיווג
+#   ?api=contributions[&month=2025-10]                התרומות העיקריות לשינוי החודשי
+
+QUERY_KINDS = ("true", "group", "series", "level", "contributions")
+# הפרמטרים שכל סוג שאילתה קורא; כל השאר לא נכנס למפתח המטמון
+QUERY_PARAMS = {
+    "true": (),
+    "group": ("code", "month"),
+    "series": ("code", "from", "to"),
+    "level": ("level", "month"),
+    "contributions": ("month",),
+}
+# כמה שאילתות שונות נשמרות לכל גרסת נתונים (LRU)
+QUERY_CACHE_SIZE = 256
+
+
+class ApiQueryError(ValueError):
+    pass
+
+
+def _parse_int(params, name):
+    raw = params.get(name)
+    if raw is None:
+        raise ApiQueryError(f"missing parameter: {name}")
+    try:
+        return int(raw)
+    except ValueError:
+        raise ApiQueryError(f"{name} must be an integer, got {raw!r}")
+
+
+def _parse_period(raw, name):
+    # YYYY-MM -> (שנה, חודש)
+    try:
+        year, month = (int(part) for part in raw.split("-"))
+    except ValueError:
+        raise ApiQueryError(f"{name} must be YYYY-MM, got {raw!r}")
+    if not 1 <= month <= 12:
+        raise ApiQueryError(f"{name} must be YYYY-MM, got {raw!r}")
+    return year, month
+
+
+def _month_param(store, params):
+    raw = params.get("month")
+    if raw is None:
+        return 0
+    month = store.month_index(*_parse_period(raw, "month"))
+    if month is None:
+        raise ApiQueryError(f"no data for month {raw}")
+    return month
+
+
+def _code_param(store, params):
+    code = _parse_int(params, "code")
+    if code not in store:
+        raise ApiQueryError(f"unknown code: {code}")
+    return code
+
+
+def _series_query(store, params):
+    code = _code_param(store, params)
+    # הסדרה שמורה מהחדש לישן, לכן "to" קובע את ההתחלה ו-"from" את הסוף
+    periods = [tuple(p) for p in store.periods.tolist()]
+    start, end = 0, len(periods)
+    if "to" in params:
+        to = _parse_period(params["to"], "to")
+        start = next((i for i, p in enumerate(periods) if p <= to), end)
+    if "from" in params:
+        since = _parse_period(params["from"], "from")
+        end = next((i for i, p in enumerate(periods) if p < since), end)
+    window = set(periods[start:end])
+    records = [r for r in store.records(code, end) if (r["year"], r["month"]) in window]
+    return {"code": code, "name": store.name(code), "data": records}
+
+
+def _level_query(store, params):
+    tree = store.tree
+    level = _parse_int(params, "level")
+    if tree is None or level not in tree.by_level:
+        raise ApiQueryError(f"unknown level: {level}")
+    month = _month_param(store, params)
+    codes = tree.by_level[level]
+    columns = {field: store.column(codes, field, month).tolist() for field in FIELDS}
+    groups = []
+    for i, code in enumerate(codes):
+        entry = {"code": code, "name": store.name(code, tree.name(code)), "parent_code": tree.parent[code]}
+        entry.update((field, None if math.isnan(values[i]) else values[i]) for field, values in columns.items())
+        groups.append(entry)
+    return {"level": level, "period": store.period_label(month), "groups": groups}
+
+
+def answer_query(store, params):
+    kind = params.get("api")
+    if kind == "true":
+        return build_machine_ready_data(store)
+    if kind == "group":
+        code = _code_param(store, params)
+        month = _month_param(store, params)
+        return {"code": code, "name": store.name(code), "data": store.latest_record(code, month)}
+    if kind == "series":
+        return _series_query(store, params)
+    if kind == "level":
+        return _level_query(store, params)
+    if kind == "contributions":
+        month = _month_param(store, params)
+        return {"period": store.period_label(month), "data": get_calculated_contributions(store, month)}
+    raise ApiQueryError(f"unknown api query {kind!r}, expected one of: {', '.join(QUERY_KINDS)}")
+
+
+def canonical_query(query):
+    # זוגות (פרמטר, ערך) -> tuple ממוין עם api והפרמטרים שהסוג שלה קורא בלבד,
+    # כך שפרמטרים זרים לא יוצרים רשומות חדשות במטמון
+    params = dict(query)
+    used = ("api",) + QUERY_PARAMS.get(params.get("api"), ())
+    return tuple(sorted((name, value) for name, value in params.items() if name in used))
+
+
+@versioned(maxsize=QUERY_CACHE_SIZE)
+def query_body(store, query):
+    # query קנוני (canonical_query); ApiQueryError עוברת לקורא ולכן שגיאות לא נשמרות במטמון
+    params = dict(query)
+    if params.get("api") == "true":
+        return get_api_body(store)
+    return dumps(answer_query(store, params))
+
+
+def query_error_body(error, query):
+    return dumps({"error": str(error), "query": dict(query)})
+
+
+def get_query_body(store, query):
+    # גוף התשובה ל-?api=... בדשבורד, כולל גוף שגיאה לשאילתה לא תקינה
+    try:
+        return query_body(store, canonical_query(query))
+    except ApiQueryError as e:
+        return query_error_body(e, query)
+
+
+def publish_api(store, static_dir=STATIC_DIR):
+    # כותב את api.json ואת הקבצים הנלווים רק כשהתוכן השתנה; מחזיר את ה-sha256
+    static_dir = Path(static_dir)
+    static_dir.mkdir(parents=True, exist_ok=True)
+    data = get_api_json(store).encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+
+    api_path = static_dir / API_NAME
+    hash_path = static_dir / f"{API_NAME}.sha256"
+    gz_path = static_dir / f"{API_NAME}.gz"
+    if api_path.exists() and gz_path.exists() and hash_path.exists() and hash_path.read_text().split()[0] == digest:
+        return digest
+
+    write_atomic(api_path, data)
+    write_atomic(gz_path, gzip.compress(data, compresslevel=9, mtime=0))
+    write_atomic(hash_path, f"{digest}  {API_NAME}\n".encode("utf-8"))
+    return digest
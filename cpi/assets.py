@@ -0,0 +1,178 @@
+import base64
+import hashlib
+import json
+import re
+import threading
+from functools import lru_cache
+from html import escape
+from pathlib import Path
+
+from cpi.files import write_atomic
+
+# ===================
+# מאגר נכסי SVG לכל התהליך
+# ===================
+# כל קבצי assets/SVG נקראים פעם אחת. במקום להטמיע כל אייקון כ-base64 בכל
+# מקום שבו הוא מופיע, העמוד מקבל גיליון sprite אחד (<symbol> לכל אייקון)
+# והאלמנטים מפנים אליו לפי id עם <use>.
+
+SVG_DIR = Path("assets/SVG")
+
+# גיליון הסגנונות ומה שהוא מפנה אליו (פונטים) מתפרסמים תחת static/, שמוגש
+# ע"י Streamlit בנתיב app/static. שם הקובץ כולל hash של התוכן ולכן הדפדפן
+# יכול לשמור אותו במטמון לתמיד.
+STYLESHEET = Path("style.css")
+STATIC_DIR = Path("static")
+STATIC_URL = "app/static"
+MANIFEST_NAME = "assets-manifest.json"
+
+# אייקון מרכזי לכל אחד מהתורמים העיקריים, וכל האייקונים שהעמוד מפנה אליהם ב-sprite
+CONTRIBUTOR_ICONS = {
+    121390: "Asset 13.svg",
+    121190: "Asset 15.svg",
+    121360: "icon-car.svg",
+    121410: "Asset 18.svg",
+    'unified_fresh': "Asset 17.svg"
+}
+
+DASHBOARD_ICONS = (
+    "Asset 1.svg", "Asset 2.svg", "Asset 3.svg", "Asset 4.svg", "circle-gray.svg",
+    "neutral gray icn.svg", "icon_neutral.svg", "button up.svg", "button down.svg",
+    "Asset 8.svg", "Asset 11.svg", "Asset 12.svg"
+) + tuple(dict.fromkeys(CONTRIBUTOR_ICONS.values()))
+
+_CSS_URL = re.compile(r"""url\(\s*["']?([^"')]+?)["']?\s*\)""")
+
+_SVG_OPEN = re.compile(r"<svg\b([^>]*)>", re.S)
+_VIEW_BOX = re.compile(r'viewBox="([^"]*)"')
+_PROLOG = re.compile(r"<\?xml[^>]*\?>")
+
+
+def symbol_id(name):
+    # "Asset 4.svg" -> "icon-asset-4"
+    return "icon-" + re.sub(r"[^a-z0-9]+", "-", Path(name).stem.lower()).strip("-")
+
+
+class SvgAsset:
+    def __init__(self, name, raw):
+        self.name = name
+        self.raw = raw
+        self.id = symbol_id(name)
+
+        text = _PROLOG.sub("", raw.decode("utf-8")).strip()
+        opening = _SVG_OPEN.search(text)
+        view_box = _VIEW_BOX.search(opening.group(1)) if opening else None
+        self.view_box = view_box.group(1) if view_box else None
+        self.body = text[opening.end():text.rindex("</svg>")] if opening else ""
+
+    @property
+    def base64(self):
+        return base64.b64encode(self.raw).decode("utf-8")
+
+    def symbol(self):
+        view_box = f' viewBox="{self.view_box}"' if self.view_box else ""
+        return f'<symbol id="{self.id}"{view_box}>{self.body}</symbol>'
+
+
+class AssetRegistry:
+    def __init__(self, svg_dir=SVG_DIR):
+        self.svgs = {}
+        for path in sorted(Path(svg_dir).glob("*.svg")):
+            self.svgs[path.name] = SvgAsset(path.name, path.read_bytes())
+
+    def __getitem__(self, name):
+        return self.svgs[Path(name).name]
+
+    def __contains__(self, name):
+        return Path(name).name in self.svgs
+
+    @lru_cache(maxsize=None)
+    def sprite_sheet(self, names):
+        # מוסתר בגודל 0 ולא ב-display:none - אחרת דפדפנים לא מציירים gradients מתוך ה-symbol
+        symbols = "".join(self[name].symbol() for name in names if name in self)
+        return (
+            '<svg xmlns="http://www.w3.org/2000/svg" aria-hidden="true" '
+            'style="position:absolute; width:0; height:0; overflow:hidden;">'
+            f"{symbols}</svg>"
+        )
+
+    def icon(self, name, css_class=None, style=None, alt=None):
+        asset = self[name]
+        attrs = ""
+        if css_class:
+            attrs += f' class="{css_class}"'
+        if style:
+            attrs += f' style="{style}"'
+        if asset.view_box:
+            attrs += f' viewBox="{asset.view_box}"'
+        attrs += f' role="img" aria-label="{escape(alt)}"' if alt else ' aria-hidden="true"'
+        return f'<svg{attrs}><use href="#{asset.id}"/></svg>'
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def publish_bytes(data, static_dir, subdir, stem, suffix):
+    # מחזיר נתיב יחסי ל-static/; קובץ עם אותו hash כבר קיים - אין מה לכתוב
+    rel = f"{subdir}/{stem}.{content_hash(data)}{suffix}"
+    target = Path(static_dir) / rel
+    if not target.exists():
+        write_atomic(target, data)
+    return rel
+
+
+class StaticAssets:
+    def __init__(self, stylesheet, manifest):
+        # stylesheet: הטקסט הסופי, עם כתובות הפונטים המפורסמים
+        self.stylesheet = stylesheet
+        # manifest: נתיב מקור -> נתיב יחסי תחת static/
+        self.manifest = manifest
+
+    def url(self, source):
+        return f"{STATIC_URL}/{self.manifest[source]}"
+
+
+def publish_static_assets(stylesheet=STYLESHEET, static_dir=STATIC_DIR):
+    manifest = {}
+
+    def rewrite(match):
+        source = Path(match.group(1))
+        if source.is_absolute() or not source.is_file():
+            return match.group(0)
+        rel = publish_bytes(source.read_bytes(), static_dir, "fonts", source.stem, source.suffix)
+        manifest[source.as_posix()] = rel
+        return f'url("{STATIC_URL}/{rel}")'
+
+    css = _CSS_URL.sub(rewrite, Path(stylesheet).read_text(encoding="utf-8"))
+    manifest[Path(stylesheet).as_posix()] = publish_bytes(
+        css.encode("utf-8"), static_dir, "css", Path(stylesheet).stem, ".css"
+    )
+    manifest_bytes = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+    manifest_path = Path(static_dir) / MANIFEST_NAME
+    if not manifest_path.exists() or manifest_path.read_bytes() != manifest_bytes:
+        write_atomic(manifest_path, manifest_bytes)
+    return StaticAssets(css, manifest)
+
+
+_registry = None
+_static_assets = None
+_registry_lock = threading.Lock()
+
+
+def get_assets():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = AssetRegistry()
+    return _registry
+
+
+def get_static_assets():
+    global _static_assets
+    if _static_assets is None:
+        with _registry_lock:
+            if _static_assets is None:
+                _static_assets = publish_static_assets()
+    return _static_assets
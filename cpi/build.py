@@ -0,0 +1,61 @@
+import argparse
+import time
+
+from cpi.api import publish_api
+from cpi.assets import publish_static_assets
+from cpi.export import PAGE_NAME, publish_page
+from cpi.snapshot import SNAPSHOT_PATH, source_hash
+from cpi.store import DATA_DIR, LOAD_EXECUTORS, build_store, save_snapshot
+from cpi.summary import SUMMARY_PATH, save_summary
+
+# ===================
+# שלב הבנייה: python -m cpi.build
+# ===================
+# תמונת המצב הבינארית של data/, תקציר השחרור האחרון לציור הראשון,
+# static/api.json והמהדורה הסטטית static/dashboard.html של גרסת הנתונים הזו,
+# ופרסום הפונטים, גיליון הסגנונות ו-plotly.js תחת static/
+
+
+def build_snapshot(data_dir=DATA_DIR, output=SNAPSHOT_PATH, workers=None, executor=None):
+    start = time.perf_counter()
+    store = build_store(data_dir, source_hash(data_dir), workers, executor)
+    save_snapshot(store, output)
+    return store, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile data/ into a memory-mappable CPI snapshot and publish static assets")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--output", default=str(SNAPSHOT_PATH))
+    parser.add_argument("--summary", default=str(SUMMARY_PATH))
+    parser.add_argument("--workers", type=int, help="parallel parsers (default: CPI_LOAD_WORKERS or the CPU count)")
+    parser.add_argument("--executor", choices=LOAD_EXECUTORS, help="default: CPI_LOAD_EXECUTOR or process")
+    parser.add_argument("--timings", nargs="?", type=int, const=10, metavar="N", help="print the N slowest files")
+    args = parser.parse_args(argv)
+
+    store, elapsed = build_snapshot(args.data_dir, args.output, args.workers, args.executor)
+    print(
+        f"wrote {args.output}: {len(store)} series x {len(store.periods)} months, "
+        f"source {store.source_hash[:12]}, {elapsed * 1000:.0f} ms"
+    )
+    save_summary(store, args.summary, args.data_dir, args.output)
+    print(f"wrote {args.summary} for {store.period_label(0)}")
+    if args.timings:
+        parse_total = sum(seconds for _, seconds in store.load_timings)
+        print(f"parsed {len(store.load_timings)} files, {parse_total * 1000:.1f} ms of parse time")
+        for path, seconds in sorted(store.load_timings, key=lambda t: t[1], reverse=True)[:args.timings]:
+            print(f"  {seconds * 1000:7.2f} ms  {path}")
+
+    digest = publish_api(store)
+    print(f"published static/api.json (+ .gz, .sha256), sha256 {digest[:12]}")
+
+    digest = publish_page(store)
+    print(f"published static/{PAGE_NAME}, sha256 {digest[:12]}")
+
+    static_assets = publish_static_assets()
+    for source, rel in sorted(static_assets.manifest.items()):
+        print(f"published {source} -> static/{rel}")
+
+
+if __name__ == "__main__":
+    main()
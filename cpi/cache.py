@@ -0,0 +1,169 @@
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+from cpi.metrics import CACHE_REQUESTS
+
+# ===================
+# שכבת מטמון לפי גרסת נתונים
+# ===================
+# כל תוצאה נגזרת נשמרת תחת (גרסת הנתונים, פונקציה, ארגומנטים). הגרסה היא
+# ה-hash של תוכן data/ שמחזיק ה-store, ולכן ריצה שמקבלת store אחד רואה רק
+# תוצאות של אותה גרסה. כשמגיעה גרסה חדשה הרשומות הישנות נזרקות בבת אחת.
+# פונקציה שמוגדרת עם maxsize (למשל תוצאות לפי חודש) שומרת בתוך הגרסה רק את
+# maxsize הקריאות האחרונות שלה, לפי סדר שימוש (LRU).
+
+KEEP_VERSIONS = 2
+
+# כל פגיעה והחטאה נספרות במדדי התהליך (cpi/metrics.py); מדידת הרינדור
+# (cpi/perf.py) מקבלת בנוסף את אלה שקורות בחוט שלה
+_observer = threading.local()
+
+
+def observe(callback):
+    # callback(שם הפונקציה, hit) לכל שליפה בחוט הנוכחי; None מפסיק
+    _observer.callback = callback
+
+
+def _notify(key, hit):
+    CACHE_REQUESTS.inc(function=key[0], result="hit" if hit else "miss")
+    callback = getattr(_observer, "callback", None)
+    if callback is not None:
+        callback(key[0], hit)
+
+
+class VersionedCache:
+    def __init__(self, keep_versions=KEEP_VERSIONS):
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()
+        # {גרסה: {מפתח: ערך}} - בסדר הכנסה, הישנה ראשונה
+        self._versions = {}
+        self._key_locks = {}
+        # {(גרסה, פונקציה): OrderedDict של מפתחות} - סדר השימוש לפונקציות עם maxsize
+        self._recent = {}
+
+    def _bucket(self, version):
+        bucket = self._versions.get(version)
+        if bucket is None:
+            bucket = self._versions[version] = {}
+            while len(self._versions) > self.keep_versions:
+                stale = next(iter(self._versions))
+                del self._versions[stale]
+                self._key_locks = {k: v for k, v in self._key_locks.items() if k[0] != stale}
+                self._recent = {k: v for k, v in self._recent.items() if k[0] != stale}
+        return bucket
+
+    def _touch(self, version, key, maxsize):
+        # key[0] הוא שם הפונקציה; הקריאה הישנה ביותר שלה נזרקת כשהיא עוברת את maxsize
+        recent = self._recent.setdefault((version, key[0]), OrderedDict())
+        recent[key] = None
+        recent.move_to_end(key)
+        while len(recent) > maxsize:
+            stale, _ = recent.popitem(last=False)
+            self._versions[version].pop(stale, None)
+            self._key_locks.pop((version, stale), None)
+
+    def get_or_compute(self, version, key, compute, maxsize=None):
+        with self._lock:
+            bucket = self._bucket(version)
+            if key in bucket:
+                if maxsize is not None:
+                    self._touch(version, key, maxsize)
+                _notify(key, True)
+                return bucket[key]
+            key_lock = self._key_locks.setdefault((version, key), threading.Lock())
+
+        # נעילה לכל מפתח כדי שסשנים מקבילים לא יחשבו את אותה תוצאה פעמיים
+        with key_lock:
+            with self._lock:
+                bucket = self._versions.get(version)
+                if bucket is not None and key in bucket:
+                    _notify(key, True)
+                    return bucket[key]
+            _notify(key, False)
+            value = compute()
+            with self._lock:
+                if version in self._versions:
+                    self._versions[version][key] = value
+                    if maxsize is not None:
+                        self._touch(version, key, maxsize)
+            return value
+
+    def carry_over(self, old_version, new_version, remap):
+        # מעתיק רשומות מגרסה קודמת לחדשה; remap(key) מחזיר את המפתח בגרסה החדשה או None
+        with self._lock:
+            old = self._versions.get(old_version)
+            if not old:
+                return 0
+            bucket = self._bucket(new_version)
+            moved = 0
+            for key, value in list(old.items()):
+                new_key = remap(key)
+                if new_key is not None and new_key not in bucket:
+                    bucket[new_key] = value
+                    moved += 1
+            return moved
+
+    def invalidate(self):
+        with self._lock:
+            self._versions = {}
+            self._key_locks = {}
+            self._recent = {}
+
+    def versions(self):
+        with self._lock:
+            return list(self._versions)
+
+
+cache = VersionedCache()
+
+# {שם פונקציה: מיקום הארגומנט month במפתח} - פונקציות שהתוצאה שלהן תלויה רק בעמודת חודש אחת
+_month_local = {}
+
+
+def versioned(fn=None, *, maxsize=None, month_local=False):
+    # הארגומנט הראשון הוא ה-store; המפתח נבנה מהשם המלא של הפונקציה כדי
+    # שהגדרה מחדש של אותה פונקציה בכל ריצת סקריפט תפגע באותה רשומה.
+    # @versioned(maxsize=N) שומר רק את N הקריאות האחרונות של הפונקציה בכל גרסה.
+    # @versioned(month_local=True) מסמן שהתוצאה תלויה רק בעמודת month, וכך היא
+    # עוברת לגרסה הבאה כשנקלט חודש חדש (carry_over)
+    if fn is None:
+        return functools.partial(versioned, maxsize=maxsize, month_local=month_local)
+    name = f"{fn.__module__}.{fn.__qualname__}"
+    signature = inspect.signature(fn)
+    if month_local:
+        _month_local[name] = list(signature.parameters).index("month") - 1
+
+    @functools.wraps(fn)
+    def wrapper(store, *args, **kwargs):
+        # ערכי ברירת המחדל נכנסים למפתח, כך ש-f(store) ו-f(store, 0) חולקים רשומה
+        bound = signature.bind(store, *args, **kwargs)
+        bound.apply_defaults()
+        key = (name, tuple(bound.arguments.values())[1:])
+        return cache.get_or_compute(store.version, key, lambda: fn(*bound.args, **bound.kwargs), maxsize)
+
+    return wrapper
+
+
+def carry_over(old_version, new_version, shift, touched=()):
+    # אחרי קליטה: עמודת month בגרסה הישנה היא month + shift בחדשה. תוצאות של
+    # פונקציות month_local עוברות כמו שהן, חוץ מחודשים שהקליטה עדכנה (touched,
+    # לפי המספור החדש). כל השאר מחושב מחדש לפי הצורך.
+    touched = set(touched)
+
+    def remap(key):
+        name, args = key
+        position = _month_local.get(name)
+        if position is None:
+            return None
+        month = args[position] + shift
+        if month in touched:
+            return None
+        return name, args[:position] + (month,) + args[position + 1:]
+
+    return cache.carry_over(old_version, new_version, remap)
+
+
+def invalidate():
+    cache.invalidate()
@@ -0,0 +1,412 @@
+import math
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io
+
+from cpi.cache import versioned
+from cpi.dashboard import MONTH_CACHE_SIZE, get_calculated_contributions, get_sorted_contributions
+from cpi.store import FIELD_INDEX, MAIN_CODE, get_store
+
+# ===================
+# גרפי הדשבורד
+# ===================
+# הבונים מחזירים go.Figure; figure_spec שומר את ה-JSON הסופי של כל גרף פעם אחת
+# לכל גרסת נתונים, וכל הסשנים מקבלים את אותה מחרוזת מוכנה.
+
+# ===================
+# הכנת נתוני הגרפים
+# ===================
+# תוויות, צבעים וטווחי צירים נגזרים וקטורית ישירות ממערכי ה-store, בלי DataFrame
+# זמני ובלי לולאה בפייתון לכל נקודה - אותו קוד ל-13 חודשים או לכל ההיסטוריה.
+
+MONTH_NAMES = np.array([
+    "", "'ינו", "'פבר", 'מרץ', "'אפר", 'מאי', 'יוני',
+    'יולי', "'אוג", "'ספט", "'אוק", "'נוב", "'דצמ"
+])
+
+
+def chart_window(store, code, n, fields, month=0):
+    # n החודשים שבהם הסדרה קיימת עד עמודת החודש month (כולל), בסדר כרונולוגי
+    row = store.row(code)
+    if row is None:
+        return None, {}
+    present = np.flatnonzero(~np.isnan(store.values[row, month:, 0])) + month
+    months = present[:n][::-1]
+    values = store.values[row, months]
+    return store.periods[months], {field: values[:, FIELD_INDEX[field]] for field in fields}
+
+
+def month_labels(periods):
+    years = periods[:, 0].astype(str)
+    return np.char.add(np.char.add(MONTH_NAMES[periods[:, 1]], "<br>"), years)
+
+
+def date_labels(periods):
+    months = np.char.zfill(periods[:, 1].astype(str), 2)
+    return np.char.add(np.char.add(months, "/"), periods[:, 0].astype(str))
+
+
+def sign_colors(values, positive, negative, zero=None):
+    # zero=None - אפס נצבע כמו ערך חיובי
+    if zero is None:
+        return np.where(values >= 0, positive, negative)
+    return np.select([values > 0, values < 0], [positive, negative], zero)
+
+
+def padded_range(*arrays, pad=0.2):
+    # [שלם מתחת למינימום, שלם מעל המקסימום] עם מרווח pad לפחות, NaN לא נספר;
+    # None כשאין אף ערך, ואז Plotly בוחר את הטווח בעצמו
+    values = np.concatenate(arrays)
+    if not np.isfinite(values).any():
+        return None
+    return [math.floor(np.nanmin(values) - pad), math.ceil(np.nanmax(values) + pad)]
+
+
+def every_other_tick(n):
+    # שנתה לכל חודש שני, כך שהחודש האחרון תמיד מסומן
+    return np.arange((n - 1) % 2, n, 2)
+
+
+def build_monthly_change_chart(store, month=0, n=13):
+    periods, series = chart_window(store, MAIN_CODE, n, ("monthly_change",), month)
+    monthly_change = series["monthly_change"]
+    month_name = month_labels(periods)
+    colors = sign_colors(monthly_change, '#2E6DB4', '#E05A10', '#999999')
+
+    # int() בקוד המקורי קוטם לכיוון אפס - np.trunc שומר על אותם גבולות
+    y_range_min = float((np.trunc(monthly_change.min() / 0.2) - 1) * 0.2)
+    y_range_max = float((np.trunc(monthly_change.max() / 0.2) + 2) * 0.2)
+    bottom_line = y_range_min
+    
+    fig = go.Figure()
+    
+    general_hover_style = dict(
+        bgcolor='rgba(10, 38, 71, 0.95)',
+        bordercolor='#4A90E2',
+        font=dict(size=20, family='Rubik', color='white'),
+        align='right'
+    )
+    
+    value_hover_style = dict(
+        bgcolor="#4d4d4d",
+        bordercolor="#4d4d4d",
+        font=dict(size=20, family="Rubik", color="white")
+    )
+    
+    fig.add_trace(go.Scatter(
+        x=month_name,
+        y=[y_range_max * 0.8] * len(month_name),
+        mode='markers',
+        marker=dict(size=50, color='rgba(0,0,0,0)', symbol='square'),
+        hovertemplate='הגרף מציג את אחוז השינוי החודשי<br>במדד המחירים לצרכן בכל אחד מ-13<br>החודשים האחרונים, לעומת החודש שקדם לו.<extra></extra>',
+        showlegend=False,
+        hoverlabel=general_hover_style,
+        hoverinfo='text'
+    ))
+    
+    fig.add_trace(go.Bar(
+        x=month_name,
+        y=monthly_change,
+        marker=dict(
+            color=colors,
+            line_width=0,
+            pattern_fillmode="overlay"
+    ),
+        marker_line_width=0,
+        width=0.55, 
+        customdata=monthly_change,
+        hovertemplate='<b>%{customdata:.1f}</b><extra></extra>',
+        showlegend=False,
+        hoverlabel=value_hover_style
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=month_name,
+        y=[0] * len(month_name),
+        mode='markers',
+        marker=dict(size=35, color='rgba(0,0,0,0)'),
+        customdata=monthly_change,
+        hovertemplate='<b>%{customdata:.1f}</b><extra></extra>',
+        showlegend=False,
+        hoverlabel=value_hover_style
+    ))
+    
+    fig.add_hline(y=0, line_dash="solid", line_color="#999", line_width=2, opacity=0.7)
+    fig.add_hline(y=bottom_line, line_dash="dot", line_color="#d3d3d3", line_width=1, opacity=0.5)
+    
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Rubik", size=14, color="#999"),
+        height=500, 
+        margin=dict(l=50, r=50, t=20, b=80),
+        xaxis=dict(
+            title="",
+            showgrid=False,
+            showline=False,
+            zeroline=False,
+            tickfont=dict(size=16, family="Rubik-Medium", color="#575756")
+        ),
+        yaxis=dict(
+            title="",
+            showgrid=True,
+            gridcolor='rgba(0,0,0,0.05)',
+            showline=False,
+            zeroline=False,
+            tickfont=dict(size=16, family="Rubik-Medium", color="#575756"),
+            dtick=0.2,
+            range=[y_range_min, y_range_max]
+        ),
+        hovermode='closest'
+    )
+    
+    return fig
+
+
+def build_contributions_chart(store, month=0):
+    contributions_data = get_calculated_contributions(store, month)
+    if not contributions_data:
+        return None
+    
+    contributions_data = get_sorted_contributions(store, False, month)
+    names = [item.name for item in contributions_data]
+    contribution = np.array([item.contribution for item in contributions_data])
+
+    hover_text = np.char.add(np.char.mod("%.3f", contribution), " :תרומה")
+    colors = sign_colors(contribution, '#3A82C4', '#E8712A')
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        y=names,
+        x=contribution,
+        orientation='h',
+        marker=dict(
+            color=colors,
+            line_width=0,
+            opacity=0.85
+        ),
+        width=0.35, 
+        customdata=hover_text,
+        hovertemplate='<b>%{y}</b><br>%{customdata}<extra></extra>',
+        hoverlabel=dict(
+            bgcolor="rgba(10, 38, 71, 0.95)",
+            font=dict(size=16, family="Rubik-Medium", color="white"),
+            align='right',
+            bordercolor='#4A90E2'
+        ),
+        showlegend=False
+    ))
+    
+    # תווית מעל כל עמודה - כל ההערות נקבעות בעדכון layout אחד במקום add_annotation לכל שורה
+    fig.update_layout(annotations=[
+        dict(
+            x=0,
+            y=name,
+            text=name,
+            showarrow=False,
+            xanchor='right',
+            xshift=-10,
+            yanchor='bottom',
+            yshift=6,
+            font=dict(size=16, family="Rubik-Medium", color="#0A2647")
+        )
+        for name in names
+    ])
+
+    fig.add_vline(x=0, line_dash="dash", line_color="#333", line_width=1, opacity=0.8)
+    
+    max_abs_val = np.abs(contribution).max()
+    if max_abs_val < 0.05:
+        dtick_val = 0.01
+    elif max_abs_val <= 0.2:
+        dtick_val = 0.05
+    else:
+        dtick_val = 0.1
+
+    x_min = contribution.min()
+    x_max = contribution.max()
+
+    range_min = math.floor(x_min / dtick_val) * dtick_val
+    range_max = math.ceil(x_max / dtick_val) * dtick_val
+
+    # וידוא שהrange מכיל לפחות שנתה אחת בכל כיוון
+    if range_min == 0:
+        range_min = -dtick_val
+    if range_max == 0:
+        range_max = dtick_val
+        
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Rubik-Medium", size=16, color="#0A2647"), 
+        height=620,  
+        margin=dict(l=10, r=40, t=80, b=20, pad=10), 
+        xaxis=dict(
+            title="",
+            showgrid=False,
+            zeroline=False,
+            side='top',
+            tickfont=dict(family="Rubik-Medium", size=16, color="#575756"),
+            showticklabels=True,
+            dtick=dtick_val,
+            tick0=0,
+            tickformat=".1f",
+            showline=False,
+            ticks="outside",
+            tickcolor='#999',
+            tickwidth=1,
+            ticklen=5,
+            tickangle=0
+        ),
+        yaxis=dict(
+            title="",
+            showgrid=False,
+            showticklabels=False,
+            range=[-1.2, len(names) - 0.3], 
+        ),
+        hovermode='closest'
+    )
+    
+    fig.add_hline(y=len(names)-0.4, line_dash="dash", line_color="#999", line_width=1, opacity=0.5)
+
+    return fig
+
+
+def build_time_series_chart(store, month=0, n=26):
+    periods, series = chart_window(
+        store, MAIN_CODE, n, ("index_relative_to_2024_avg", "seasonally_adjusted"), month
+    )
+    date_str = date_labels(periods)
+    x_values = every_other_tick(len(periods))
+    x_labels = month_labels(periods[x_values])
+    x = np.arange(len(periods))
+    # הטווח לפי החלון המוצג, כך שגם חודש מלפני שנים (?month=) נכנס לציר
+    y_range = padded_range(series['index_relative_to_2024_avg'], series['seasonally_adjusted'])
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=series['index_relative_to_2024_avg'],
+        mode='lines+markers',
+        name='מדד המחירים לצרכן',
+        line=dict(color='#0a1e44', width=3),
+        marker=dict(size=6, color='#0a1e44'),
+        customdata=date_str,
+        hovertemplate='<b>מדד</b><br><b style="font-size:18px;">%{y:.1f}</b><extra></extra>',
+        showlegend=False,
+        hoverlabel=dict(
+            bgcolor="#4d4d4d",
+            bordercolor="#4d4d4d",
+            font=dict(size=14, family="Rubik", color="white")
+        )
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=series['seasonally_adjusted'],
+        mode='lines+markers',
+        name='מדד מנוכה עונתית',
+        line=dict(color='#6fe1d9', width=3),
+        marker=dict(size=6, color='#6fe1d9'),
+        customdata=date_str,
+        hovertemplate='<b>מנוכה עונתית</b><br><b style="font-size:18px;">%{y:.1f}</b><extra></extra>',
+        showlegend=False,
+        hoverlabel=dict(
+            bgcolor="#4d4d4d",
+            bordercolor="#4d4d4d",
+            font=dict(size=14, family="Rubik", color="white")
+        )
+    ))
+    
+    fig.update_layout(
+        plot_bgcolor='#f2f6fc',
+        paper_bgcolor='#f2f6fc',
+        font=dict(family="Rubik", size=13, color="#666"),
+        height=450,
+        margin=dict(l=50, r=20, t=20, b=80),
+        xaxis=dict(
+            title="",
+            showgrid=False,
+            showline=True,
+            linewidth=2,
+            linecolor='#ccc',
+            tickmode='array',
+            tickvals=x_values,
+            ticktext=x_labels,
+            tickfont=dict(size=14, family="Rubik-Medium", color="#666"),
+            ticks="outside",
+            ticklen=8,
+            tickwidth=2,
+            tickcolor='#ccc',
+            range=[-0.5, len(periods)-0.5]
+        ),
+        yaxis=dict(
+            title=dict(
+                text="מדד",
+                font=dict(size=14, family="Rubik-Medium", color="#666")
+            ),
+            showgrid=False,
+            showline=True,
+            linewidth=2,
+            linecolor='#ccc',
+            range=y_range,
+            dtick=1,
+            tickfont=dict(size=14, family="Rubik-Medium", color="#666")
+        ),
+        hovermode='closest'
+    )
+    
+    return fig
+
+
+CHARTS = {
+    "monthly_change": build_monthly_change_chart,
+    "contributions": build_contributions_chart,
+    "time_series": build_time_series_chart,
+}
+
+
+@versioned(maxsize=len(CHARTS) * MONTH_CACHE_SIZE)
+def figure_spec(store, name, month=0):
+    fig = CHARTS[name](store, month)
+    if fig is None:
+        return None
+    return plotly.io.to_json(fig, validate=False)
+
+
+# ===================
+# מדידה: python -m cpi.charts
+# ===================
+# משווה בנייה מלאה של כל גרף (חלון המערכים מה-store, go.Figure, ולידציה
+# וסריאליזציה) לשליפה מהמטמון של figure_spec
+
+def _best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure(store, repeat=20):
+    results = {}
+    for name, builder in CHARTS.items():
+        figure_spec(store, name)
+        cold = _best_of(lambda: plotly.io.to_json(builder(store), validate=False), repeat)
+        cached = _best_of(lambda: figure_spec(store, name), repeat)
+        results[name] = (cold, cached)
+    return results
+
+
+def main():
+    for name, (cold, cached) in measure(get_store()).items():
+        print(f"{name:<16} build {cold * 1000:8.2f} ms   cached {cached * 1000:8.3f} ms   x{cold / cached:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# ===================
+# עץ הסיווג של קבוצות המדד
+# ===================
+# נבנה פעם אחת מקובץ הסיווג ומחזיק את כל שאילתות ההיררכיה כחיפושי מילון:
+# הורה->ילדים, רמה->קודים, עלים, אבות, וטווח תת-עץ רציף בסדר pre-order.
+
+CLASSIFICATION_NAME = "groups_with_parent_level_siblings_depth_has_children"
+
+
+class ClassificationTree:
+    def __init__(self, items):
+        # כל הרשימות נשמרות בסדר הופעתן בקובץ, כמו הסריקות הקודמות
+        self.codes = tuple(item['group_code'] for item in items)
+        self.names = {item['group_code']: item.get('group_name', str(item['group_code'])) for item in items}
+        self.parent = {item['group_code']: item.get('parent_code') for item in items}
+        self.level = {item['group_code']: item.get('level') for item in items}
+
+        children = {code: [] for code in self.codes}
+        by_level = {}
+        for item in items:
+            code = item['group_code']
+            if item.get('parent_code') in children:
+                children[item['parent_code']].append(code)
+            by_level.setdefault(item.get('level'), []).append(code)
+        self.children = {code: tuple(kids) for code, kids in children.items()}
+        self.by_level = {level: tuple(codes) for level, codes in by_level.items()}
+
+        self.top_level = tuple(
+            item['group_code'] for item in items
+            if item.get('level') == 1 or item.get('parent_code') is None
+        )
+        self.leaf_codes = tuple(item['group_code'] for item in items if item.get('has_children') == 0)
+        self.leaves = frozenset(self.leaf_codes)
+
+        roots = [code for code in self.codes if self.parent[code] not in children]
+        self.order, self.position, self.subtree_end = self._preorder(roots)
+
+        self._ancestors = {}
+        for code in self.order:
+            parent = self.parent[code]
+            self._ancestors[code] = (parent,) + self._ancestors[parent] if parent in children else ()
+
+    def _preorder(self, roots):
+        order = []
+        position = {}
+        subtree_end = {}
+        stack = [(code, False) for code in reversed(roots)]
+        while stack:
+            code, done = stack.pop()
+            if done:
+                subtree_end[code] = len(order)
+                continue
+            position[code] = len(order)
+            order.append(code)
+            stack.append((code, True))
+            stack.extend((kid, False) for kid in reversed(self.children[code]))
+        return tuple(order), position, subtree_end
+
+    def __contains__(self, code):
+        return code in self.parent
+
+    def __len__(self):
+        return len(self.codes)
+
+    def name(self, code, default=None):
+        return self.names.get(code, default)
+
+    def is_leaf(self, code):
+        return code in self.leaves
+
+    def ancestors(self, code):
+        # מההורה הישיר ועד השורש
+        return self._ancestors.get(code, ())
+
+    def subtree_range(self, code):
+        return self.position[code], self.subtree_end[code]
+
+    def subtree(self, code):
+        start, end = self.subtree_range(code)
+        return self.order[start:end]
+
+    def descendants(self, code):
+        return self.subtree(code)[1:]
+
+    def leaves_under(self, code):
+        return tuple(c for c in self.descendants(code) if c in self.leaves)
+
+
+def build_tree(classification_data):
+    if not classification_data or 'data' not in classification_data:
+        return None
+    return ClassificationTree(classification_data['data'])
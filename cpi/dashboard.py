@@ -0,0 +1,236 @@
+import math
+
+import numpy as np
+
+from cpi.cache import versioned
+from cpi.models import Contribution, DashboardSnapshot, SelectedItem, TableRow
+from cpi.store import MAIN_CODE
+from cpi.trends import get_core_trend
+
+# ===================
+# חישובי הדשבורד
+# ===================
+# כל התוצאות הנגזרות מקבלות את ה-store ונשמרות במטמון לפי גרסת הנתונים שלו.
+# המודול לא תלוי ב-Streamlit, כך ששלב הבנייה ושרת ה-API משתמשים באותו קוד.
+# הפרמטר month הוא עמודת החודש ב-store: 0 הוא החודש האחרון, 1 הקודם לו וכן הלאה.
+
+# כמה חודשים מעובדים (תמונת מצב, HTML וגרפים) נשמרים לכל גרסת נתונים
+MONTH_CACHE_SIZE = 24
+
+@versioned(month_local=True)
+def load_table_data(store, month=0):
+    table_codes = {
+        "מדד המחירים לצרכן": MAIN_CODE,
+        "המדד ללא ירקות ופירות": 120020,
+        "המדד ללא אנרגיה": 110045,
+        "המדד ללא דיור": 110040
+    }
+
+    table_rows = []
+    for label, code in table_codes.items():
+        latest = store.record(code, month)
+        if latest:
+            table_rows.append(TableRow(
+                label=label,
+                value=f"{latest.value:.1f}",
+                monthly=f"{latest.monthly_change:.1f}%",
+                yearly=f"{latest.yearly_change:.1f}%"
+            ))
+    return tuple(table_rows)
+
+@versioned
+def load_main_index(store):
+    # SeriesView של המדד הראשי - גישה לשורה במערך, בלי רשימת מילונים לכל חודש
+    return store.view(MAIN_CODE)
+
+# ===================
+# לוגיקה חכמה לחישוב התרומות לקבוצות המשנה 
+# ===================
+@versioned(month_local=True)
+def get_calculated_contributions(store, month=0):
+    tree = store.tree
+    if tree is None:
+        return ()
+
+    leaf_codes = tree.leaf_codes
+
+    special_codes = [120042, 120043] 
+    leaf_codes = [c for c in leaf_codes if c not in special_codes]
+
+    raw_candidates = []
+
+    leaf_contribs = store.column(leaf_codes, 'contribution', month).tolist()
+    leaf_changes = store.column(leaf_codes, 'monthly_change', month).tolist()
+    for code, contrib, change in zip(leaf_codes, leaf_contribs, leaf_changes):
+        if not math.isnan(contrib):
+            raw_candidates.append(Contribution(
+                code=code,
+                name=store.name(code, str(code)),
+                contribution=contrib,
+                monthly_change=0 if math.isnan(change) else change
+            ))
+
+    unified_contrib = 0
+    unified_monthly_changes = []
+    unified_valid = False
+
+    special_contribs = store.column(special_codes, 'contribution', month).tolist()
+    special_changes = store.column(special_codes, 'monthly_change', month).tolist()
+    for contrib, change in zip(special_contribs, special_changes):
+        if not math.isnan(contrib):
+            unified_contrib += contrib
+            unified_monthly_changes.append(0 if math.isnan(change) else change)
+            unified_valid = True
+
+    if unified_valid:
+        avg_monthly = sum(unified_monthly_changes) / len(unified_monthly_changes) if unified_monthly_changes else 0
+        raw_candidates.append(Contribution(
+            code='unified_fresh',
+            name='ירקות ופירות טריים',
+            contribution=unified_contrib,
+            monthly_change=avg_monthly
+        ))
+
+    raw_candidates.sort(key=lambda x: abs(x.contribution), reverse=True)
+
+    final_items = []
+
+    for i, cand in enumerate(raw_candidates):
+        if i < 8:
+            final_items.append(cand)
+        elif i < 10:
+            if abs(cand.contribution) > 0.01:
+                final_items.append(cand)
+            else:
+                break
+        else:
+            break
+
+    return tuple(final_items)
+
+@versioned(month_local=True)
+def get_top_selected_consumption_items(store, month=0):
+    tree = store.tree
+    if tree is None:
+        return ()
+
+    level_1_stats = []
+
+    level_1_changes = store.column(tree.top_level, 'monthly_change', month).tolist()
+    for code, change in zip(tree.top_level, level_1_changes):
+        if not math.isnan(change):
+            level_1_stats.append({
+                'code': code,
+                'name': store.name(code, tree.name(code, str(code))),
+                'change': change,
+                'score': abs(change)
+            })
+
+    level_1_stats.sort(key=lambda x: x['score'], reverse=True)
+    top_5_level_1 = level_1_stats[:5]
+
+    final_results = []
+
+    for parent in top_5_level_1:
+        parent_code = parent['code']
+        parent_score = parent['score']
+
+        children = tree.children.get(parent_code, ())
+        children_to_evaluate = []
+
+        if parent_code == 120040:
+            special_codes = [120042, 120043]
+            special_changes = []
+
+            children = [c for c in children if c not in special_codes]
+
+            for c_change in store.column(special_codes, 'monthly_change', month).tolist():
+                if not math.isnan(c_change):
+                    special_changes.append(c_change)
+
+            if special_changes:
+                avg_change = sum(special_changes) / len(special_changes)
+                children_to_evaluate.append({
+                    'name': 'פירות וירקות טריים',
+                    'change': avg_change,
+                    'score': abs(avg_change)
+                })
+
+        children_changes = store.column(children, 'monthly_change', month).tolist()
+        for c_code, c_change in zip(children, children_changes):
+            if not math.isnan(c_change):
+                children_to_evaluate.append({
+                    'name': store.name(c_code, tree.name(c_code, str(c_code))),
+                    'change': c_change,
+                    'score': abs(c_change)
+                })
+
+        best_child_score = -1
+        best_child_change = 0
+        best_child_name = ""
+
+        for child_eval in children_to_evaluate:
+            if child_eval['score'] > best_child_score:
+                best_child_score = child_eval['score']
+                best_child_change = child_eval['change']
+                best_child_name = child_eval['name']
+
+        if best_child_score > parent_score:
+            final_results.append(SelectedItem(
+                name=best_child_name,
+                change=best_child_change
+            ))
+        else:
+            final_results.append(SelectedItem(
+                name=parent['name'],
+                change=parent['change']
+            ))
+
+    final_results.sort(key=lambda x: abs(x.change), reverse=True)       
+    return tuple(final_results)
+
+@versioned(month_local=True)
+def get_sorted_contributions(store, descending, month=0):
+    # תצוגה ממוינת נפרדת לכל סדר - הרשימה השמורה עצמה לא משתנה
+    return tuple(sorted(get_calculated_contributions(store, month), key=lambda x: abs(x.contribution), reverse=descending))
+
+@versioned(month_local=True)
+def get_top_contributors(store, month=0):
+    contributions_data = get_calculated_contributions(store, month)
+    if not contributions_data:
+        return ()
+    return get_sorted_contributions(store, True, month)[:5]
+
+# ===================
+# תמונת מצב לחודש ("מסע בזמן")
+# ===================
+
+@versioned
+def available_months(store):
+    # עמודות החודשים שבהם יש נתון למדד הראשי, מהחדש לישן
+    row = store.row(MAIN_CODE)
+    if row is None:
+        return ()
+    return tuple(np.flatnonzero(~np.isnan(store.values[row, :, 0])).tolist())
+
+@versioned
+def month_options(store):
+    # ((עמודת חודש, "YYYY-MM"), ...) לבחירת החודש בעמוד - נשמר גם בתקציר השחרור
+    return tuple((month, store.period_label(month)) for month in available_months(store))
+
+@versioned(maxsize=MONTH_CACHE_SIZE)
+def get_dashboard_snapshot(store, month=0):
+    # כל חלקי הדשבורד לחודש אחד; כל חלק נשלף וקטורית מעמודת החודש במערכים
+    main = store.record(MAIN_CODE, month)
+    if main is None:
+        return None
+    return DashboardSnapshot(
+        month=month,
+        period=store.period_label(month),
+        main=main,
+        table=load_table_data(store, month),
+        contributions=get_calculated_contributions(store, month),
+        top_contributors=get_top_contributors(store, month),
+        selected_items=get_top_selected_consumption_items(store, month),
+        core_trend=get_core_trend(store, month)
+    )
@@ -0,0 +1,143 @@
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+import plotly
+
+from cpi.api import get_json_ld
+from cpi.assets import DASHBOARD_ICONS, STATIC_DIR, STATIC_URL, get_assets, publish_bytes, publish_static_assets
+from cpi.charts import CHARTS, figure_spec
+from cpi.files import write_atomic
+from cpi.page import (
+    CONTRIBUTION_CHART_HEADER, CONTRIBUTIONS_HEADER, MONTHLY_CHANGE_HEADER, TIME_SERIES_HEADER, TIME_SERIES_NOTE,
+    TOP_CONTRIBUTORS_HEADER, build_hero_html, build_table_html, dashboard_snapshot, get_contributions_html,
+    selected_header_html, selected_items_html, time_series_legend_html, top_contributor_html
+)
+from cpi.store import get_store
+
+# ===================
+# מהדורה סטטית של הדשבורד: python -m cpi.export
+# ===================
+# עמוד HTML שלם לחודש האחרון, מאותם בונים של app.py (cpi/page.py): הפתיח עם
+# הטבלה הנפתחת, התרומות, הסעיפים הנבחרים, וה-JSON-LD; הגרפים מוטמעים כ-spec
+# של Plotly ומצוירים בדפדפן. נכתב ל-static/dashboard.html בכל גרסת נתונים
+# (cpi/build.py, וה-watcher כשגרסה חדשה נטענת). plotly.js מתפרסם תחת static/js
+# בשם עם hash של התוכן, ולכן נשמר במטמון הדפדפן לתמיד.
+# Streamlit מגיש את app/static כ-text/plain, ולכן את העמוד מגיש cpi/proxy.py -
+# כעמוד הנחיתה או כשהעובדים עמוסים - או שרת סטטי/CDN שמגיש את static/ בנתיב app/static.
+
+PAGE_NAME = "dashboard.html"
+PLOTLY_JS = Path(plotly.__file__).parent / "package_data" / "plotly.min.js"
+
+# התוספות למהדורה הסטטית: רוחב העמוד כמו ב-Streamlit, שתי עמודות במקום st.columns,
+# והטבלה שנפתחת בלחיצה על הפתיח במקום כפתור Streamlit
+STATIC_PAGE_CSS = """
+body { margin: 0; background: #ffffff; color: #31333f; }
+.block-container { padding-top: 2rem; padding-bottom: 4rem; }
+.static-hero .hero-open, .static-hero .table-wrapper { display: none; }
+.static-hero.open .hero-open { display: block; }
+.static-hero.open .table-wrapper { display: flex; }
+.static-hero.open .hero-closed { display: none; }
+.static-hero .footer-trigger { cursor: pointer; }
+.static-section { position: relative; }
+.static-columns { display: flex; gap: 1rem; position: relative; z-index: 10; }
+.static-columns > div { flex: 1; min-width: 0; }
+.static-chart { width: 100%; }
+.static-live-link { display: block; text-align: center; margin-top: 2rem; color: #005eb8; }
+"""
+
+PAGE_SCRIPT = """
+document.querySelectorAll(".static-hero .footer-trigger").forEach(function (trigger) {
+    trigger.addEventListener("click", function () {
+        document.getElementById("hero").classList.toggle("open");
+    });
+});
+var specs = JSON.parse(document.getElementById("chart-specs").textContent);
+document.querySelectorAll(".static-chart").forEach(function (el) {
+    var spec = specs[el.dataset.chart];
+    Plotly.newPlot(el, spec.data, spec.layout, {showLink: false, responsive: true});
+});
+"""
+
+
+def chart_div(name, specs):
+    return f'<div class="static-chart" data-chart="{name}"></div>' if specs.get(name) else ""
+
+
+def script_json(data):
+    # JSON בתוך <script>: "</" היה סוגר את התגית
+    return data.replace("</", "<\\/")
+
+
+def render_page(store, stylesheet, plotly_url):
+    snapshot = dashboard_snapshot(store, 0)
+    specs = {name: json.loads(spec) for name in CHARTS if (spec := figure_spec(store, name))}
+    contributors = "".join(top_contributor_html(c) for c in snapshot.top_contributors)
+    contributions = get_contributions_html(store) if snapshot.contributions else ""
+    # העמוד מוגש גם בשורש האתר וגם כ-app/static/dashboard.html; ה-base מצביע על
+    # השורש בשני המקרים, כך שכתובות app/static/... (פונטים, plotly.js) תקינות בשניהם
+    return f"""<!DOCTYPE html>
+<html lang="he">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="cpi-data-version" content="{store.version}">
+<title>מדד המחירים לצרכן - דשבורד</title>
+<base href="../../">
+<style>{stylesheet}{STATIC_PAGE_CSS}</style>
+<script type="application/ld+json">{script_json(get_json_ld(store))}</script>
+<script src="{plotly_url}" defer></script>
+</head>
+<body>
+{get_assets().sprite_sheet(DASHBOARD_ICONS)}
+<div class="block-container">
+<div id="hero" class="static-hero">
+<div class="hero-closed">{build_hero_html(store, False)}</div>
+<div class="hero-open">{build_hero_html(store, True)}</div>
+{build_table_html(store)}
+</div>
+<div class="chart-section">{MONTHLY_CHANGE_HEADER}{chart_div("monthly_change", specs)}</div>
+<div class="static-section">{CONTRIBUTIONS_HEADER}
+<div class="static-columns">
+<div>{TOP_CONTRIBUTORS_HEADER}{contributors}</div>
+<div>{CONTRIBUTION_CHART_HEADER}{contributions}{chart_div("contributions", specs)}</div>
+</div>
+</div>
+<div style="height: 60px;"></div>
+<div class="selected-changes-section">{selected_header_html()}{selected_items_html(snapshot.selected_items)}</div>
+<div class="time-series-section">{TIME_SERIES_HEADER}{time_series_legend_html()}{chart_div("time_series", specs)}{TIME_SERIES_NOTE}</div>
+<a class="static-live-link" href="?live">לדשבורד האינטראקטיבי - חודשים קודמים ועוד</a>
+</div>
+<script type="application/json" id="chart-specs">{script_json(json.dumps(specs, ensure_ascii=False))}</script>
+<script>window.addEventListener("DOMContentLoaded", function () {{{PAGE_SCRIPT}}});</script>
+</body>
+</html>
+"""
+
+
+def publish_page(store, static_dir=STATIC_DIR):
+    # כותב את static/dashboard.html רק כשהתוכן השתנה; מחזיר את ה-sha256
+    static_dir = Path(static_dir)
+    stylesheet = publish_static_assets(static_dir=static_dir).stylesheet
+    plotly_rel = publish_bytes(PLOTLY_JS.read_bytes(), static_dir, "js", "plotly", ".min.js")
+    data = render_page(store, stylesheet, f"{STATIC_URL}/{plotly_rel}").encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    page_path = static_dir / PAGE_NAME
+    if not page_path.exists() or page_path.read_bytes() != data:
+        write_atomic(page_path, data)
+    return digest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the dashboard for the latest month as a static HTML page")
+    parser.add_argument("--static-dir", default=str(STATIC_DIR))
+    args = parser.parse_args(argv)
+
+    store = get_store()
+    digest = publish_page(store, args.static_dir)
+    print(f"published {Path(args.static_dir) / PAGE_NAME} for {store.period_label(0)}, sha256 {digest[:12]}")
+
+
+if __name__ == "__main__":
+    main()
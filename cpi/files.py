@@ -0,0 +1,37 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# ===================
+# כתיבה אטומית לקבצים שתהליכים אחרים קוראים
+# ===================
+# קובץ זמני בשם ייחודי (mkstemp) באותה תיקייה ואז os.replace: קורא רואה את הקובץ
+# הישן או את החדש ולעולם לא קובץ חצי כתוב, ושני כותבים במקביל (build, ingest,
+# ה-proxy) לא כותבים לאותו קובץ זמני. mkstemp יוצר את הקובץ בהרשאות 600, ולכן
+# ההרשאות מתוקנות ל-644 לפני ההחלפה.
+
+
+@contextmanager
+def atomic_file(path, mode="wb", encoding=None):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_atomic(path, data):
+    # bytes נכתבים כמו שהם, מחרוזת ב-UTF-8
+    if isinstance(data, str):
+        with atomic_file(path, "w", encoding="utf-8") as f:
+            f.write(data)
+    else:
+        with atomic_file(path) as f:
+            f.write(data)
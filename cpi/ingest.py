@@ -0,0 +1,162 @@
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from cpi.snapshot import SNAPSHOT_PATH
+from cpi.store import DATA_DIR, FIELDS, CPIStore, period_key, load_store, save_snapshot
+from cpi.summary import SUMMARY_PATH, save_summary
+
+# ===================
+# קליטת חודש חדש: python -m cpi.ingest <קובץ או תיקייה>
+# ===================
+# במקום לפרסר מחדש עשר שנות היסטוריה בכל פרסום, הקליטה לוקחת רק את הרשומות
+# החדשות (באותו מבנה של קבצי data/: index_id, name, data) ומצרפת אותן ל-store
+# המהודר. הקלט הוא קובץ אחד (סדרה אחת או רשימת סדרות) או תיקייה של קבצים כאלה.
+# הגרסה החדשה נגזרת מהגרסה הקודמת ומה-hash של הקליטה, ותמונת המצב ותקציר השחרור נכתבים מחדש;
+# תהליכים רצים מזהים אותה ב-get_store ומעבירים אליה את התוצאות של החודשים שלא השתנו.
+
+
+class IngestError(Exception):
+    pass
+
+
+def read_delta(path):
+    path = Path(path)
+    files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+    series = []
+    for file_path in files:
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        series.extend(data if isinstance(data, list) else [data])
+    return series
+
+
+def delta_digest(series):
+    encoded = json.dumps(series, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _as_int(value, what):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise IngestError(f"{what} must be an integer, got {value!r}")
+
+
+def validate_delta(series):
+    # בודק את המבנה לפני שנוגעים ב-store: חודש 13 היה הופך בשקט לינואר של השנה
+    # הבאה דרך period_key, ו-index_id חסר היה נופל כ-KeyError בלי הקשר
+    if not series:
+        raise IngestError("delta contains no series")
+    for i, s in enumerate(series):
+        if not isinstance(s, dict):
+            raise IngestError(f"series #{i} is not an object")
+        if "index_id" not in s:
+            raise IngestError(f"series #{i} ({s.get('name', 'unnamed')}) has no index_id")
+        code = _as_int(s["index_id"], f"series #{i} index_id")
+        records = s.get("data") or []
+        if not isinstance(records, list):
+            raise IngestError(f"series {code}: data must be a list of records")
+        for j, r in enumerate(records):
+            where = f"series {code} record #{j}"
+            if not isinstance(r, dict) or "year" not in r or "month" not in r:
+                raise IngestError(f"{where} needs year and month")
+            _as_int(r["year"], f"{where} year")
+            month = _as_int(r["month"], f"{where} month")
+            if not 1 <= month <= 12:
+                raise IngestError(f"{where} month must be 1-12, got {month}")
+
+
+def apply_delta(store, series):
+    # מחזיר store חדש; העבודה היא לפי מספר הרשומות בקליטה (O(קבוצות) לחודש חדש)
+    # ועוד העתקה אחת של המערך הקיים לתוך המערך המורחב
+    validate_delta(series)
+
+    latest = period_key(*store.periods[0].tolist()) if len(store.periods) else -1
+    oldest = period_key(*store.periods[-1].tolist()) if len(store.periods) else -1
+    incoming = {period_key(int(r["year"]), int(r["month"])) for s in series for r in s.get("data") or []}
+    new_keys = sorted((k for k in incoming if k > latest), reverse=True)
+    for key in incoming:
+        if key < oldest or (key <= latest and store.month_index(key // 12, key % 12 + 1) is None):
+            raise IngestError(f"{key // 12}-{key % 12 + 1:02d} is not a month of the compiled store")
+    if len(store.periods) and new_keys and new_keys[-1] != latest + 1:
+        raise IngestError(f"delta skips months after {store.period_label(0)}")
+
+    shift = len(new_keys)
+    new_periods = np.array([[k // 12, k % 12 + 1] for k in new_keys], dtype=store.periods.dtype).reshape(-1, 2)
+    periods = np.concatenate([new_periods, store.periods])
+
+    codes, names = list(store.codes), list(store.names)
+    index = dict(store.index)
+    renamed = False
+    for s in series:
+        code = int(s["index_id"])
+        name = s.get("name", str(code))
+        if code not in index:
+            index[code] = len(codes)
+            codes.append(code)
+            names.append(name)
+        elif name != names[index[code]]:
+            names[index[code]] = name
+            renamed = True
+    added = len(codes) - len(store.codes)
+
+    values = np.full((len(codes), len(periods), len(FIELDS)), np.nan)
+    values[:len(store.codes), shift:] = store.values
+
+    touched = set()
+    for s in series:
+        row = index[int(s["index_id"])]
+        for r in s.get("data") or []:
+            key = period_key(int(r["year"]), int(r["month"]))
+            month = new_keys.index(key) if key > latest else store.month_index(key // 12, key % 12 + 1) + shift
+            values[row, month] = [r.get(field) for field in FIELDS]
+            if month >= shift:
+                touched.add(month)
+
+    version = hashlib.sha256(f"{store.version}:{delta_digest(series)}".encode("utf-8")).hexdigest()
+    fresh = CPIStore(codes, names, periods, values, store.classification, version, store.base_hash)
+    if not added and not renamed:
+        # קוד חדש או שם שהשתנה משפיעים על כל החודשים - אז אין מה להעביר מהגרסה הקודמת
+        fresh.lineage = {"parent": store.version, "shift": shift, "touched": sorted(touched)}
+    return fresh
+
+
+def ingest(delta_path, data_dir=DATA_DIR, snapshot_path=SNAPSHOT_PATH, summary_path=SUMMARY_PATH):
+    start = time.perf_counter()
+    store = load_store(data_dir, snapshot_path)
+    loaded = time.perf_counter()
+    fresh = apply_delta(store, read_delta(delta_path))
+    applied = time.perf_counter()
+    save_snapshot(fresh, snapshot_path)
+    save_summary(fresh, summary_path, data_dir, snapshot_path)
+    saved = time.perf_counter()
+    return store, fresh, (loaded - start, applied - loaded, saved - applied)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append a new month's records to the compiled CPI snapshot")
+    parser.add_argument("delta", help="JSON file (one series or a list) or a directory of such files")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--snapshot", default=str(SNAPSHOT_PATH))
+    parser.add_argument("--summary", default=str(SUMMARY_PATH))
+    args = parser.parse_args(argv)
+
+    try:
+        store, fresh, (load, apply, save) = ingest(args.delta, args.data_dir, args.snapshot, args.summary)
+    except IngestError as e:
+        parser.exit(1, f"ingest failed: {e}\n")
+    new_months = fresh.lineage["shift"] if fresh.lineage else len(fresh.periods) - len(store.periods)
+    print(
+        f"ingested {args.delta}: {new_months} new month(s), latest {fresh.period_label(0)}, "
+        f"version {store.version[:12]} -> {fresh.version[:12]}"
+    )
+    print(f"load {load * 1000:.1f} ms, apply {apply * 1000:.1f} ms, write {save * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
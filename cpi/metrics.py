@@ -0,0 +1,245 @@
+import logging
+import os
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cpi.files import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# ===================
+# מדדי תפעול בפורמט הטקסט של Prometheus
+# ===================
+# כל תהליך (Streamlit או שרת ה-API) סופר לעצמו: משך ריצות הסקריפט ושל כל חלק
+# בעמוד, בתים של HTML ושל JSON גרפים שנשלחו בכל ריצה, פגיעות והחטאות במטמון
+# לכל פונקציה, טעינות ה-store, סשנים פעילים וגיל גרסת הנתונים. הייצוא:
+#   CPI_METRICS_PORT=9464          GET /metrics בפורט נפרד (CPI_METRICS_HOST, ברירת מחדל 0.0.0.0)
+#   CPI_METRICS_FILE=path.prom     קובץ שנכתב מחדש כל CPI_METRICS_INTERVAL שניות (ברירת מחדל 15)
+# שרת ה-API מחזיר את המדדים של התהליך שלו גם ב-GET /metrics.
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+DEFAULT_INTERVAL = 15.0
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self):
+        with self._lock:
+            return [f"{self.name}{_labels(self.labels, key)} {_number(value)}" for key, value in sorted(self._values.items())]
+
+    def render(self):
+        samples = self.samples()
+        return self.header() + samples if samples else []
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def values(self):
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=(), function=None):
+        super().__init__(name, help, labels)
+        self.function = function
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function):
+        # function() מחזיר ערך (או {תוויות: ערך}), או None כשאין מה לדווח
+        self.function = function
+
+    def samples(self):
+        if self.function is not None:
+            value = self.function()
+            if value is None:
+                return []
+            values = value if isinstance(value, dict) else {(): value}
+            with self._lock:
+                self._values = dict(values)
+        return super().samples()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=SECONDS_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        lines = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    le = (("le", _number(bound)),)
+                    lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {count}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+                lines.append(f"{self.name}_count{_labels(self.labels, key)} {counts[-1]}")
+        return lines
+
+
+SCRIPT_RUN_SECONDS = Histogram("cpi_script_run_seconds", "Wall time of a full dashboard script run")
+SECTION_SECONDS = Histogram("cpi_section_seconds", "Wall time of one dashboard section per run", ("section",))
+RUN_SENT_BYTES = Histogram(
+    "cpi_run_sent_bytes", "Bytes enqueued to the browser per run, by payload kind", ("kind",), BYTES_BUCKETS
+)
+CACHE_REQUESTS = Counter("cpi_cache_requests_total", "Version-cache lookups by function and result", ("function", "result"))
+CACHE_HIT_RATIO = Gauge("cpi_cache_hit_ratio", "Share of version-cache lookups served from the cache", ("function",))
+STORE_LOADS = Counter("cpi_store_loads_total", "Data store loads by source", ("source",))
+STORE_LOAD_SECONDS = Histogram("cpi_store_load_seconds", "Time to load the data store", ("source",))
+ACTIVE_SESSIONS = Gauge("cpi_active_sessions", "Connected Streamlit sessions")
+DATA_VERSION_AGE = Gauge("cpi_data_version_age_seconds", "Seconds since the serving data version was built")
+DATA_VERSION = Gauge("cpi_data_version_info", "The serving data version and its latest month", ("version", "period"))
+
+REGISTRY = (
+    SCRIPT_RUN_SECONDS, SECTION_SECONDS, RUN_SENT_BYTES, CACHE_REQUESTS, CACHE_HIT_RATIO,
+    STORE_LOADS, STORE_LOAD_SECONDS, ACTIVE_SESSIONS, DATA_VERSION_AGE, DATA_VERSION,
+)
+
+
+def _hit_ratios():
+    totals = {}
+    for (function, result), count in CACHE_REQUESTS.values().items():
+        hits, lookups = totals.get(function, (0, 0))
+        totals[function] = (hits + (count if result == "hit" else 0), lookups + count)
+    return {(function,): hits / lookups for function, (hits, lookups) in totals.items()}
+
+
+CACHE_HIT_RATIO.set_function(_hit_ratios)
+
+
+def observe_run(record):
+    # נקרא מ-cpi/perf.py בסוף כל ריצה שהושלמה
+    SCRIPT_RUN_SECONDS.observe(record["seconds"])
+    for name, section in record["sections"].items():
+        SECTION_SECONDS.observe(section["seconds"], section=name)
+    for kind, size in record["sent"].items():
+        RUN_SENT_BYTES.observe(size, kind=kind)
+
+
+def observe_store(store):
+    DATA_VERSION_AGE.set_function(lambda: time.time() - store.built_at)
+    DATA_VERSION.set_function(lambda: {(store.version[:12], store.period_label(0)): 1})
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def write_file(path):
+    # כתיבה אטומית, כך שקורא (למשל textfile collector) לא רואה קובץ חלקי
+    write_atomic(path, render())
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    server_version = "cpi-metrics/1"
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = render().encode("utf-8")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _write_forever(path, interval):
+    while True:
+        try:
+            write_file(path)
+        except OSError:
+            logger.exception("Could not write metrics to %s", path)
+        time.sleep(interval)
+
+
+_started = False
+_started_lock = threading.Lock()
+
+
+def start_metrics():
+    # פעם אחת לכל תהליך, לפי משתני הסביבה; בלי הגדרה לא נפתח פורט ולא נכתב קובץ
+    global _started
+    with _started_lock:
+        if _started:
+            return
+        _started = True
+        port = os.environ.get("CPI_METRICS_PORT")
+        if port:
+            host = os.environ.get("CPI_METRICS_HOST", "0.0.0.0")
+            try:
+                server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+            except OSError:
+                logger.exception("Could not serve metrics on %s:%s", host, port)
+            else:
+                server.daemon_threads = True
+                threading.Thread(target=server.serve_forever, name="cpi-metrics", daemon=True).start()
+                logger.info("Serving metrics on http://%s:%s/metrics", host, port)
+        path = os.environ.get("CPI_METRICS_FILE")
+        if path:
+            interval = float(os.environ.get("CPI_METRICS_INTERVAL", DEFAULT_INTERVAL))
+            threading.Thread(target=_write_forever, args=(path, interval), name="cpi-metrics-file", daemon=True).start()
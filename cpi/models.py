@@ -0,0 +1,77 @@
+import json
+from dataclasses import asdict, dataclass, is_dataclass
+from types import MappingProxyType
+from typing import Optional, Union
+
+# ===================
+# מודל נתונים בלתי ניתן לשינוי
+# ===================
+# התוצאות במטמון משותפות לכל הסשנים בלי העתקה, ולכן הן קפואות:
+# dataclass קפוא לרשומות, tuple לרשימות ו-MappingProxyType למילונים.
+
+
+@dataclass(frozen=True)
+class Contribution:
+    code: Union[int, str]
+    name: str
+    contribution: float
+    monthly_change: float
+
+
+@dataclass(frozen=True)
+class SelectedItem:
+    name: str
+    change: float
+
+
+@dataclass(frozen=True)
+class TableRow:
+    label: str
+    value: str
+    monthly: str
+    yearly: str
+
+
+@dataclass(frozen=True)
+class CoreTrend:
+    # קצב שינוי שנתי מנורמל (באחוזים) על חלון של window חודשים שמתואר ב-period
+    without_housing: float
+    without_housing_fruit_vegetables: float
+    period: str
+    window: int
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    # כל חלקי הדשבורד לחודש אחד; month היא עמודת החודש ב-store (0 = האחרון),
+    # main הוא ה-Record של המדד הראשי בחודש הזה (cpi/store.py)
+    month: int
+    period: str
+    main: object
+    table: tuple
+    contributions: tuple
+    top_contributors: tuple
+    selected_items: tuple
+    core_trend: Optional[CoreTrend]
+
+
+def freeze(obj):
+    if isinstance(obj, dict):
+        return MappingProxyType({key: freeze(value) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze(value) for value in obj)
+    return obj
+
+
+def json_default(obj):
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    if is_dataclass(obj):
+        return asdict(obj)
+    if hasattr(obj, "as_dict"):
+        return obj.as_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj, **kwargs):
+    return json.dumps(obj, default=json_default, **kwargs)
@@ -0,0 +1,333 @@
+from cpi.assets import CONTRIBUTOR_ICONS, get_assets
+from cpi.cache import versioned
+from cpi.dashboard import MONTH_CACHE_SIZE, get_dashboard_snapshot
+from cpi.models import dumps
+from cpi.summary import ReleaseSummary
+from cpi.trends import MONTH_NAMES_HEBREW
+
+# ===================
+# ה-HTML של חלקי הדשבורד
+# ===================
+# כל הבונים מקבלים source - תקציר השחרור (cpi/summary.py) או ה-store - וחודש,
+# ומחזירים מחרוזות HTML מוכנות. המודול לא תלוי ב-Streamlit: app.py שולח את
+# המחרוזות כ-st.markdown, והמהדורה הסטטית (cpi/export.py) מרכיבה מהן עמוד שלם.
+# האייקונים מפנים לגיליון ה-sprite של העמוד (cpi/assets.py).
+
+def get_circle_svg(value):
+    if value > 0:
+        return "Asset 4.svg"
+    elif value < 0:
+        return "Asset 2.svg"
+    else:
+        return "circle-gray.svg"
+
+def get_arrow_svg(value):
+    if value > 0:
+        return "Asset 3.svg"
+    elif value < 0:
+        return "Asset 1.svg"
+    else:
+        return "neutral gray icn.svg"
+    
+def dashboard_snapshot(source, month):
+    # source הוא תקציר השחרור (cpi/summary.py, רק לחודש האחרון) או ה-store; לשניהם
+    # אותה version, ולכן ה-HTML שנבנה מהם נשמר תחת אותו מפתח במטמון
+    if isinstance(source, ReleaseSummary):
+        return source.snapshot
+    return get_dashboard_snapshot(source, month)
+
+@versioned(maxsize=2 * MONTH_CACHE_SIZE)
+def build_hero_html(source, show_table, month=0):
+    assets = get_assets()
+    snapshot = dashboard_snapshot(source, month)
+    latest_data = snapshot.main
+
+    monthly_change = latest_data.get('monthly_change', 0)
+    yearly_change = latest_data.get('yearly_change', 0)
+    index_val = latest_data.get('index_relative_to_2024_avg', 0)
+    
+    curr_month = int(latest_data.get('month', 11))
+    curr_year = int(latest_data.get('year', 2025))
+    
+    prev_month = 12 if curr_month == 1 else curr_month - 1
+    
+    curr_month_name = MONTH_NAMES_HEBREW.get(curr_month, "")
+    prev_month_name = MONTH_NAMES_HEBREW.get(prev_month, "")
+
+    m_dir = "ירד" if monthly_change < 0 else "עלה" if monthly_change > 0 else "נותר ללא שינוי"
+    y_dir = "ירד" if yearly_change < 0 else "עלה" if yearly_change > 0 else "נותר ללא שינוי"
+
+    if monthly_change == 0:
+        m_hover = f"בחודש {curr_month_name} {curr_year} נותר מדד המחירים לצרכן ללא שינוי לעומת {prev_month_name}, והגיע לרמה של {index_val:.1f} נקודות (הבסיס: ממוצע 2024=100.0 נקודות)."
+    else:
+        m_hover = f"בחודש {curr_month_name} {curr_year} {m_dir} מדד המחירים לצרכן ב-{abs(monthly_change):.1f}% לעומת {prev_month_name}, והגיע לרמה של {index_val:.1f} נקודות (הבסיס: ממוצע 2024=100.0 נקודות)."
+
+    if yearly_change == 0:
+        y_hover = f"ב-12 החודשים האחרונים ({curr_month_name} {curr_year} לעומת {curr_month_name} {curr_year-1}) נותר מדד המחירים לצרכן ללא שינוי."
+    else:
+        y_hover = f"ב-12 החודשים האחרונים ({curr_month_name} {curr_year} לעומת {curr_month_name} {curr_year-1}) {y_dir} מדד המחירים לצרכן ב-{abs(yearly_change):.1f}%."
+
+    current_date = f"{curr_month_name} {curr_year}"
+    
+    # מגמת מדדי הליבה כפי שפורסמה (cpi/trends.py); לחודש בלי פרסום מוצג "-"
+    core_trend = snapshot.core_trend
+    if core_trend:
+        right_trend = f"{core_trend.without_housing:.1f}%"
+        left_trend = f"{core_trend.without_housing_fruit_vegetables:.1f}%"
+        trend_tooltip = f"קצב שינוי מחושב לפי נתוני {core_trend.period},&#10;מנורמל לקצב שנתי.&#10;{right_trend} - ללא דיור&#10;{left_trend} - ללא דיור, ירקות ופירות"
+    else:
+        right_trend = left_trend = "-"
+        trend_tooltip = "לא פורסמה מגמת מדדי ליבה לחודש זה"
+
+    if show_table:
+        asset_action = "button up.svg"
+        expand_text = "סגור נתונים נוספים"
+    else:
+        asset_action = "button down.svg"
+        expand_text = "להרחבה על מדדים נוספים (ללא רכיבים)"
+
+    arrow_m = get_arrow_svg(monthly_change)
+    arrow_y = get_arrow_svg(yearly_change)
+    circle_m = get_circle_svg(monthly_change)
+    circle_y = get_circle_svg(yearly_change)
+
+    def render_arrow(data):
+        return assets.icon(data, style="width:50px; margin-bottom:5px;")
+
+    m_title = "ירידה לעומת החודש הקודם" if monthly_change < 0 else "עלייה לעומת החודש הקודם"
+    if monthly_change == 0: m_title = "ללא שינוי מהחודש הקודם"
+
+    hero_html = f"""
+    <div class="hero-container">
+        <div class="main-title">מדד המחירים לצרכן - {current_date}</div>
+        <div class="hero-section">
+            <div class="metrics-row">
+                <div class="metric-box">
+                    <div class="metric-title">{m_title}</div>
+                    <div class="circle-container" data-tooltip="{m_hover}">
+                        {assets.icon(circle_m, "circle-bg-img")}
+                        <div class="circle-content">
+                            {render_arrow(arrow_m)}
+                            <div class="percentage-value">{abs(monthly_change):.1f}%</div>
+                        </div>
+                    </div>
+                    <div class="bottom-info">
+                        <div class="metric-subtitle">רמת המדד</div>
+                        <div class="index-level">{index_val:.1f} נק'</div>
+                    </div>
+                </div>
+                <div class="metric-box">
+                    <div class="metric-title">שינוי ב-12 חודשים</div>
+                    <div class="circle-container" data-tooltip="{y_hover}">
+                        {assets.icon(circle_y, "circle-bg-img")}
+                        <div class="circle-content">
+                            {render_arrow(arrow_y)}
+                            <div class="percentage-value">{abs(yearly_change):.1f}%</div>
+                        </div>
+                    </div>
+                    <div class="bottom-info" style="display: flex; flex-direction: column; align-items: center; width: 100%;">
+                        <div class="metric-subtitle">מגמה - מדדי ליבה</div>
+                        <div class="trend-tooltip-container" 
+                             data-tooltip="{trend_tooltip}"
+                             style="display: flex; justify-content: center; align-items: center; gap: 10px;">
+                            <div class="index-level" dir="ltr" style="display: flex; justify-content: center; align-items: center; gap: 10px;">
+                                <div>{left_trend}</div>
+                                <div style="color: rgba(255, 255, 255, 0.5); font-weight: 300;">|</div>
+                                <div>{right_trend}</div>
+                            </div>
+                        </div>
+                    </div>
+                </div>
+            </div>
+            <div class="footer-trigger">
+                <div style="color:white; font-size:1.5rem; margin-bottom:4px;">{expand_text}</div>
+                {assets.icon(asset_action, style="width: 55px;")}
+            </div>
+        </div>
+    </div>
+    """
+    return "".join(line.strip() for line in hero_html.splitlines())
+
+@versioned(maxsize=MONTH_CACHE_SIZE)
+def build_table_html(source, month=0):
+    rows = dashboard_snapshot(source, month).table
+    table_html = """
+        <div class="table-wrapper">
+            <div class="table-container">
+                <table class="custom-table">
+                    <thead>
+                        <tr>
+                            <th>מדד</th>
+                            <th>רמת המדד</th>
+                            <th>שינוי ביחס לחודש קודם</th>
+                            <th>שינוי ב-12 חודשים</th>
+                        </tr>
+                    </thead>
+                    <tbody>"""
+    for r in rows:
+        m_val = f'<span class="minus-fix">{r.monthly}</span>' if "-" in r.monthly else r.monthly
+        y_val = f'<span class="minus-fix">{r.yearly}</span>' if "-" in r.yearly else r.yearly
+        
+        table_html += f"""
+                <tr>
+                    <td style="background-color:#f8f9fa !important; font-weight:bold; color:#0A2647 !important;">{r.label}</td>
+                    <td>{r.value}</td>
+                    <td>{m_val}</td>
+                    <td>{y_val}</td>
+                </tr>"""
+    table_html += "</tbody></table></div></div>"
+    return table_html
+
+@versioned(maxsize=MONTH_CACHE_SIZE)
+def get_contributions_html(source, month=0):
+    ascending = sorted(dashboard_snapshot(source, month).contributions, key=lambda x: abs(x.contribution))
+    machine_ready_json = dumps(ascending, ensure_ascii=False)
+    return f'<div id="machine-ready-contributions" style="display: none;">{machine_ready_json}</div>'
+
+def top_contributor_html(contributor):
+    assets = get_assets()
+    change = contributor.monthly_change
+    item_code = contributor.code
+
+    center_icon_svg = CONTRIBUTOR_ICONS.get(item_code, "Asset 15.svg")
+
+    if change > 0:
+        circle_svg = "Asset 4.svg"
+        arrow_svg = "Asset 3.svg"
+        change_class = "positive"
+    elif change < 0:
+        circle_svg = "Asset 2.svg"
+        arrow_svg = "Asset 1.svg"
+        change_class = "negative"
+    else:
+        circle_svg = "circle-gray.svg"
+        arrow_svg = "icon_neutral.svg"
+        change_class = ""
+
+    return f"""
+        <div class="top-contributor-item">
+            <div class="contributor-info">
+                <div class="contributor-name">{contributor.name}</div>
+                <div class="contributor-change {change_class}">
+                    {assets.icon(arrow_svg, "contributor-arrow", alt="arrow")}
+                    <span dir="ltr">{abs(change):.1f}%</span>
+                </div>
+            </div>
+            <div class="contributor-circle" style="position: relative; width: 96px; height: 96px;">
+                {assets.icon(circle_svg, style="width: 100%; height: 100%; display: block;", alt="circle")}
+                <div style="position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%); 
+                            width: 52px; height: 52px; overflow: hidden;">
+                    {assets.icon(center_icon_svg, style="width: 100%; height: 100%; display: block;", alt="icon")}
+                </div>
+            </div>
+        </div>
+    """
+
+def selected_items_html(top_changes):
+    assets = get_assets()
+    # בניית העמודות באמצעות HTML גמיש
+    grid_html = '<div style="display: flex; justify-content: space-between; direction: rtl; width: 100%;">\n'
+
+    for i, item in enumerate(top_changes):
+        change = item.change
+
+        arrow_svg = get_arrow_svg(change)
+
+        # הוספת קו הפרדה עבה ואפור.
+        border_style = 'border-left: 8px solid #cccccc;' if i < len(top_changes) - 1 else ''
+
+        # בניית הקובייה עם המחלקות החדשות שעוקפות את החסימה
+        grid_html += f'<div style="flex: 1; text-align: center; padding: 0.5rem; display: flex; flex-direction: column; justify-content: space-between; {border_style}">\n'
+
+        # שם הקבוצה מקבל את העיצוב המוגדל
+        grid_html += f'<div class="custom-group-name">\n'
+        grid_html += f'{item.name}\n'
+        grid_html += f'</div>\n'
+
+        grid_html += f'<div style="display: flex; align-items: center; justify-content: center; gap: 0.5rem; margin-top: 0.5rem;">\n'
+        grid_html += f'<div dir="ltr" class="custom-group-percent">\n'
+        grid_html += f'{change:.1f}%\n'
+        grid_html += f'</div>\n'
+        grid_html += f'{assets.icon(arrow_svg, style="width: 24px; height: 24px;", alt="arrow")}\n'
+        grid_html += f'</div>\n'
+        grid_html += f'</div>\n'
+
+    grid_html += '</div>'
+    return grid_html
+
+# ===================
+# כותרות החלקים
+# ===================
+
+MONTHLY_CHANGE_HEADER = """
+    <div class="chart-title">אחוז שינוי בכל חודש לעומת החודש הקודם</div>
+    <div class="chart-subtitle">13 החודשים האחרונים</div>
+"""
+
+CONTRIBUTIONS_HEADER = """
+    <div style="position: absolute; width: 100%; height: 950px; right: 0; background-color: #f2f6fc; z-index: 0; pointer-events: none; margin-top: -20px;"></div>
+    <div class="contributions-title">תרומת קבוצות מוצרים ושירותים לשינוי החודשי במדד</div>
+"""
+
+TOP_CONTRIBUTORS_HEADER = """
+        <div class="contribution-column">
+            <div class="column-title">התורמים העיקריים לשינוי החודשי</div>
+            <div class="column-subtitle">(אחוז השינוי של הסעיף)</div>
+        </div>
+    """
+
+CONTRIBUTION_CHART_HEADER = """
+        <div class="contribution-column" style="padding-right: 40px;">
+            <div class="column-title">תרומה לשינוי החודשי</div>
+            <div class="column-subtitle">(נקודות מדד)</div>
+        </div>
+    """
+
+TIME_SERIES_HEADER = """
+    <div style="background: #f2f6fc; padding: 1.5rem 2rem 1rem 2rem; margin: 0; text-align: right;">
+        <div class="shared-main-title">
+            מדד המחירים לצרכן לאורך זמן
+        </div>
+        <div class="shared-subtitle" style="margin-bottom: 2rem !important;">
+            רמת המדד והרכיב העונתי
+        </div>
+    </div>
+"""
+
+TIME_SERIES_NOTE = """
+    <div style="background: #f2f6fc; padding: 1rem 2rem; margin: -2rem 0 0 0;">
+        <div style="font-family: 'Rubik-Medium', sans-serif; font-size: 1.1rem; color: #575756; text-align: right; margin-bottom: 2rem; direction: rtl;">
+            *המדד המנוכה עונתיות מוצג לצורך המחשה; ייתכנו עדכונים רטרואקטיביים.
+        </div>
+    </div>
+"""
+
+def selected_header_html():
+    assets = get_assets()
+    return f"""
+    <div class="selected-header">
+        <div class="selected-titles">
+            <div class="shared-main-title">שינויים בסעיפי צריכה נבחרים</div>
+            <div class="shared-subtitle">שיעור השינוי במחירים לעומת החודש הקודם</div>
+        </div>
+        {assets.icon("Asset 8.svg", "selected-image", alt="cart")}
+    </div>
+    <div class="price-changes-title">עליות וירידות מחירים בולטות</div>
+"""
+
+def time_series_legend_html():
+    assets = get_assets()
+    return f"""
+    <div style="background: #f2f6fc; padding: 0 2rem 1rem 2rem; margin: 0;">
+        <div class="custom-legend" style="margin: 0;">
+            <div class="legend-item">
+                {assets.icon("Asset 11.svg", "legend-icon", alt="icon")}
+                <span class="legend-text">מדד המחירים לצרכן</span>
+            </div>
+            <div class="legend-item">
+                {assets.icon("Asset 12.svg", "legend-icon", alt="icon")}
+                <span class="legend-text">מדד המחירים לצרכן<br>מנוכה עונתית</span>
+            </div>
+        </div>
+    </div>
+"""
@@ -0,0 +1,118 @@
+import collections
+import statistics
+import threading
+import time
+
+from cpi import cache, metrics
+
+# ===================
+# זמני רינדור לפי חלקי העמוד
+# ===================
+# כל ריצה של app.py מחולקת לחלקים (פתיח, גרף השינוי החודשי, תרומות וכו').
+# לכל חלק נרשמים זמן קיר, פגיעות והחטאות במטמון שקרו בתוכו (כולל קריאות
+# מקוננות, עם שמות הפונקציות שהחטיאו) ומספר הבתים שנשלחו לדפדפן. ריצות
+# שהסתיימו נשמרות במאגר מתגלגל לכל תהליך (recent_runs) ונספרות במדדי התהליך
+# (cpi/metrics.py); עם ?debug=perf העמוד מציג את הריצה הנוכחית וסיכום המאגר
+# בשכבה צפה.
+
+PERF_BUFFER_SIZE = 200
+
+_runs = collections.deque(maxlen=PERF_BUFFER_SIZE)
+_runs_lock = threading.Lock()
+# הריצה הנמדדת בחוט הנוכחי - כל ריצת סקריפט של Streamlit רצה בחוט משלה
+_current = threading.local()
+
+
+class RenderRun:
+    def __init__(self):
+        self.timestamp = time.time()
+        self.info = {}
+        self.sections = {}
+        self.seconds = None
+        # {סוג: בתים} לכל הריצה - html, figure או other
+        self.sent_bytes = collections.Counter()
+        self._started = time.perf_counter()
+        self._open = None
+        self._open_since = None
+
+    def section(self, name):
+        # סוגר את החלק הקודם ופותח את name; כל מה שקורה עד הקריאה הבאה נזקף לו
+        now = time.perf_counter()
+        self._close(now)
+        self.sections[name] = {"seconds": 0.0, "hits": 0, "misses": 0, "missed": [], "bytes": 0}
+        self._open, self._open_since = name, now
+
+    def _close(self, now):
+        if self._open is not None:
+            self.sections[self._open]["seconds"] = now - self._open_since
+            self._open = None
+
+    def cache_event(self, name, hit):
+        if self._open is None:
+            return
+        section = self.sections[self._open]
+        if hit:
+            section["hits"] += 1
+        else:
+            section["misses"] += 1
+            section["missed"].append(name.rsplit(".", 1)[-1])
+
+    def sent(self, size, kind):
+        self.sent_bytes[kind] += size
+        if self._open is not None:
+            self.sections[self._open]["bytes"] += size
+
+    def finish(self):
+        now = time.perf_counter()
+        self._close(now)
+        self.seconds = now - self._started
+        if getattr(_current, "run", None) is self:
+            _current.run = None
+            cache.observe(None)
+        record = self.as_dict()
+        with _runs_lock:
+            _runs.append(record)
+        metrics.observe_run(record)
+        return record
+
+    def as_dict(self):
+        return {
+            "timestamp": self.timestamp, "seconds": self.seconds, **self.info,
+            "sections": self.sections, "sent": dict(self.sent_bytes),
+        }
+
+
+def start_run():
+    run = RenderRun()
+    _current.run = run
+    cache.observe(run.cache_event)
+    return run
+
+
+def sent(size, kind="other"):
+    # נקרא לכל הודעה שיוצאת מהריצה; מחוץ לריצה נמדדת לא עושה כלום
+    run = getattr(_current, "run", None)
+    if run is not None:
+        run.sent(size, kind)
+
+
+def recent_runs():
+    with _runs_lock:
+        return list(_runs)
+
+
+def summarize(runs):
+    # {חלק: {ריצות, חציון, מקסימום, ריצות עם החטאה}} על פני המאגר
+    timings = {}
+    for run in runs:
+        for name, section in run["sections"].items():
+            timings.setdefault(name, []).append(section)
+    return {
+        name: {
+            "runs": len(sections),
+            "median": statistics.median(s["seconds"] for s in sections),
+            "max": max(s["seconds"] for s in sections),
+            "missed_runs": sum(1 for s in sections if s["misses"]),
+        }
+        for name, sections in timings.items()
+    }
@@ -0,0 +1,349 @@
+import argparse
+import json
+import logging
+import mimetypes
+import os
+import re
+import signal
+import subprocess
+import sys
+
+import tornado.web
+import tornado.websocket
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError, HTTPRequest
+from tornado.ioloop import IOLoop, PeriodicCallback
+
+from cpi.assets import STATIC_DIR
+from cpi.export import PAGE_NAME
+from cpi.store import get_store
+from cpi.watcher import publish_store, start_watcher
+
+logger = logging.getLogger(__name__)
+
+# ===================
+# מצב ריבוי תהליכים: python -m cpi.proxy --workers N --port 8501
+# ===================
+# מריץ N תהליכי Streamlit (כל אחד עם חימום, cpi/warmup.py) על פורטים פנימיים,
+# ומולם reverse proxy מקומי ב-tornado (שמגיע עם Streamlit). כל סשן נצמד לעובד
+# אחד: הבקשה הראשונה מקבלת עוגיית cpi_worker, וה-websocket של הסשן וכל בקשות
+# ה-HTTP שלו (קבצי מדיה, העלאות) הולכים לאותו עובד. סשן חדש הולך לעובד המוכן
+# עם הכי מעט סשנים פתוחים; עובד שנפל מופעל מחדש.
+# כל העובדים ממפים את אותה תמונת מצב (build/cpi_snapshot.bin) לקריאה בלבד, כך
+# שהנתונים נמצאים בזיכרון פעם אחת ב-page cache; לכל תהליך רק התוצאות הנגזרות.
+# רק ה-proxy בונה: בעלייה ובכל שינוי ב-data/ הוא בונה את תמונת המצב ואת תקציר
+# השחרור ומפרסם את static/, והעובדים (CPI_WATCH_ROLE=follow, cpi/watcher.py) רק
+# ממפים את תמונת המצב החדשה כשהיא מוחלפת.
+# את static/ (בנתיב app/static) ה-proxy מגיש בעצמו, עם סוגי התוכן הנכונים ומטמון
+# קבוע לקבצים עם hash בשם; לקובץ עם עותק דחוס מראש לצידו (api.json.gz) לקוח
+# שמקבל gzip מקבל את העותק הזה במקום דחיסה מחדש בכל בקשה. המהדורה הסטטית (static/dashboard.html, cpi/export.py)
+# מוגשת ב-/ במקום סשן חי כשכל העובדים עמוסים או שאף אחד לא מוכן, ועם
+# CPI_STATIC_LANDING=1 גם לכל מבקר חדש; הקישור ?live בעמוד פותח את הדשבורד החי.
+#
+# הגדרות: CPI_WORKERS = מספר העובדים (ברירת מחדל: מספר הליבות)
+#         CPI_WORKER_BASE_PORT = הפורט של העובד הראשון (ברירת מחדל 8600)
+#         CPI_WORKER_SESSIONS = סשנים פתוחים לעובד שמעליהם הוא עמוס (ברירת מחדל 0 - בלי הגבלה)
+#         CPI_STATIC_LANDING = 1 - מבקרים חדשים מקבלים את המהדורה הסטטית
+#         CPI_METRICS_PORT = אם מוגדר, עובד i מייצא מדדים בפורט CPI_METRICS_PORT + i
+
+DEFAULT_PORT = 8501
+DEFAULT_BASE_PORT = 8600
+WORKER_COOKIE = "cpi_worker"
+STREAM_PATH = "/_stcore/stream"
+HEALTH_PATH = "/_stcore/health"
+SUPERVISE_SECONDS = 1.0
+STATIC_PAGE = STATIC_DIR / PAGE_NAME
+# שם קובץ עם hash של התוכן (cpi/assets.py publish_bytes) - התוכן שלו לא ישתנה לעולם
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.")
+# כותרות hop-by-hop שלא מעבירים הלאה
+HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailers",
+    "transfer-encoding", "upgrade", "content-length",
+}
+
+
+class Worker:
+    def __init__(self, index, port, script, streamlit_args):
+        self.index = index
+        self.port = port
+        self.script = script
+        self.streamlit_args = streamlit_args
+        self.process = None
+        self.ready = False
+        self.sessions = 0
+        self.restarts = 0
+        # עולה בכל הפעלה; סשן שנפתח מול הפעלה קודמת לא מוריד את המונה של הנוכחית
+        self.generation = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        env = dict(os.environ, CPI_WATCH_ROLE="follow")
+        if "CPI_METRICS_PORT" in env:
+            env["CPI_METRICS_PORT"] = str(int(env["CPI_METRICS_PORT"]) + self.index)
+        self.process = subprocess.Popen([
+            sys.executable, "-m", "cpi.warmup", "--run", self.script,
+            "--server.port", str(self.port), "--server.address", "127.0.0.1",
+            "--server.headless", "true", *self.streamlit_args
+        ], env=env)
+        self.ready = False
+        self.sessions = 0
+        self.generation += 1
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        if self.alive():
+            self.process.terminate()
+
+    def as_dict(self):
+        return {"index": self.index, "port": self.port, "ready": self.ready, "sessions": self.sessions,
+                "restarts": self.restarts, "pid": self.process.pid if self.process else None}
+
+
+class Pool:
+    def __init__(self, workers, max_sessions=0, static_landing=False):
+        self.workers = workers
+        self.max_sessions = max_sessions
+        self.static_landing = static_landing
+        self.http = AsyncHTTPClient()
+
+    def pick(self, cookie=None):
+        # העובד מהעוגייה אם הוא מוכן; אחרת המוכן עם הכי מעט סשנים, או None
+        if cookie is not None and cookie.isdigit() and int(cookie) < len(self.workers):
+            worker = self.workers[int(cookie)]
+            if worker.ready:
+                return worker
+        ready = [w for w in self.workers if w.ready]
+        return min(ready, key=lambda w: w.sessions) if ready else None
+
+    def saturated(self):
+        ready = [w for w in self.workers if w.ready]
+        return not ready or bool(self.max_sessions) and all(w.sessions >= self.max_sessions for w in ready)
+
+    async def supervise(self):
+        for worker in self.workers:
+            if not worker.alive():
+                if worker.process is not None:
+                    logger.warning("Worker %d exited with %s, restarting", worker.index, worker.process.returncode)
+                    worker.restarts += 1
+                worker.start()
+                continue
+            if not worker.ready:
+                try:
+                    await self.http.fetch(worker.url + HEALTH_PATH, request_timeout=2)
+                except (HTTPClientError, OSError):
+                    continue
+                worker.ready = True
+                logger.info("Worker %d ready on port %d", worker.index, worker.port)
+
+    def stop(self):
+        for worker in self.workers:
+            worker.stop()
+
+
+class StreamProxy(tornado.websocket.WebSocketHandler):
+    # websocket של סשן: מחובר לעובד אחד לכל אורך הסשן, הודעות מועברות כמו שהן בשני הכיוונים
+    def initialize(self, pool):
+        self.pool = pool
+        self.worker = None
+        self.generation = None
+        self.upstream = None
+
+    def select_subprotocol(self, subprotocols):
+        # כמו Streamlit: הפרוטוקול הראשון ("streamlit"); השאר (מזהה סשן לחיבור מחדש) עוברים לעובד
+        return subprotocols[0] if subprotocols else None
+
+    async def open(self):
+        self.worker = self.pool.pick(self.get_cookie(WORKER_COOKIE))
+        if self.worker is None:
+            self.close(1013, "no worker ready")
+            return
+        headers = {name: value for name, value in self.request.headers.get_all()
+                   if name.lower() not in HOP_HEADERS and not name.lower().startswith("sec-websocket")}
+        subprotocols = [p.strip() for p in self.request.headers.get("Sec-WebSocket-Protocol", "").split(",") if p.strip()]
+        request = HTTPRequest(f"ws://127.0.0.1:{self.worker.port}{self.request.uri}", headers=headers)
+        try:
+            self.upstream = await tornado.websocket.websocket_connect(
+                request, subprotocols=subprotocols or None, on_message_callback=self._from_worker
+            )
+        except (HTTPClientError, OSError) as e:
+            logger.warning("Worker %d refused a session: %s", self.worker.index, e)
+            self.close(1011, "worker unavailable")
+            return
+        self.worker.sessions += 1
+        self.generation = self.worker.generation
+
+    def _from_worker(self, message):
+        if message is None:
+            self.close()
+            return
+        try:
+            self.write_message(message, binary=isinstance(message, bytes))
+        except tornado.websocket.WebSocketClosedError:
+            self.upstream.close()
+
+    async def on_message(self, message):
+        if self.upstream is not None:
+            await self.upstream.write_message(message, binary=isinstance(message, bytes))
+
+    def on_close(self):
+        if self.upstream is not None:
+            self.upstream.close()
+            self.upstream = None
+            if self.generation == self.worker.generation:
+                self.worker.sessions -= 1
+
+
+class HttpProxy(tornado.web.RequestHandler):
+    SUPPORTED_METHODS = ("GET", "HEAD", "POST", "PUT", "DELETE", "OPTIONS", "PATCH")
+
+    def initialize(self, pool):
+        self.pool = pool
+
+    def _static_landing(self):
+        # המהדורה הסטטית במקום עמוד ה-Streamlit: למבקר חדש עם CPI_STATIC_LANDING, ולכולם כשאין עובד פנוי
+        if self.request.path != "/" or self.request.method not in ("GET", "HEAD") or "live" in self.request.arguments:
+            return False
+        if self.pool.static_landing and self.get_cookie(WORKER_COOKIE) is None:
+            return True
+        return self.pool.saturated()
+
+    async def _proxy(self):
+        if self._static_landing():
+            try:
+                page = STATIC_PAGE.read_bytes()
+            except FileNotFoundError:
+                pass
+            else:
+                self.set_header("Content-Type", "text/html; charset=utf-8")
+                self.set_header("Cache-Control", "no-cache")
+                self.finish(page)
+                return
+        worker = self.pool.pick(self.get_cookie(WORKER_COOKIE))
+        if worker is None:
+            self.set_status(503)
+            self.finish("no worker ready\n")
+            return
+        headers = {name: value for name, value in self.request.headers.get_all() if name.lower() not in HOP_HEADERS}
+        body = self.request.body if self.request.method in ("POST", "PUT", "PATCH", "DELETE") else None
+        response = await self.pool.http.fetch(HTTPRequest(
+            worker.url + self.request.uri, method=self.request.method, headers=headers, body=body,
+            follow_redirects=False, decompress_response=False, allow_nonstandard_methods=True, request_timeout=60
+        ), raise_error=False)
+        if response.code == 599:
+            self.set_status(502)
+            self.finish("worker unavailable\n")
+            return
+        self.set_status(response.code, response.reason)
+        self._headers.clear()
+        for name, value in response.headers.get_all():
+            if name.lower() not in HOP_HEADERS:
+                self.add_header(name, value)
+        if self.get_cookie(WORKER_COOKIE) != str(worker.index):
+            self.set_cookie(WORKER_COOKIE, str(worker.index), httponly=True, samesite="Lax")
+        self.finish(response.body or b"")
+
+    get = head = post = put = delete = options = patch = _proxy
+
+
+class StaticAssetHandler(tornado.web.StaticFileHandler):
+    # static/ בנתיב app/static, כמו ב-Streamlit; קבצים עם hash בשם נשמרים במטמון לתמיד
+    precompressed = False
+
+    def validate_absolute_path(self, root, absolute_path):
+        # <קובץ>.gz שנכתב בפרסום (cpi/api.py publish_api) מוגש כמו שהוא; ה-ETag
+        # מחושב מהבתים שלו, כך שהוא שונה מזה של הגרסה הלא דחוסה
+        absolute_path = super().validate_absolute_path(root, absolute_path)
+        if absolute_path is not None and "gzip" in self.request.headers.get("Accept-Encoding", ""):
+            compressed = absolute_path + ".gz"
+            try:
+                # tornado שומר את ה-stat מהאימות לגודל ולזמן השינוי - הוא צריך לתאר את הקובץ שנשלח
+                self._stat_result = os.stat(compressed)
+            except FileNotFoundError:
+                return absolute_path
+            self.precompressed = True
+            return compressed
+        return absolute_path
+
+    def get_content_type(self):
+        if self.precompressed:
+            return mimetypes.guess_type(self.absolute_path[:-len(".gz")])[0] or "application/octet-stream"
+        return super().get_content_type()
+
+    def get_cache_time(self, path, modified, mime_type):
+        return self.CACHE_MAX_AGE if HASHED_NAME.search(path) else 0
+
+    def set_extra_headers(self, path):
+        if self.precompressed:
+            self.set_header("Content-Encoding", "gzip")
+        if HASHED_NAME.search(path):
+            self.set_header("Cache-Control", f"public, max-age={self.CACHE_MAX_AGE}, immutable")
+
+
+class HealthHandler(tornado.web.RequestHandler):
+    # 200 כשלפחות עובד אחד מוכן; ?workers מחזיר את מצב כל העובדים
+    def initialize(self, pool):
+        self.pool = pool
+
+    def get(self):
+        ready = any(w.ready for w in self.pool.workers)
+        self.set_status(200 if ready else 503)
+        if "workers" in self.request.arguments:
+            self.set_header("Content-Type", "application/json")
+            self.finish(json.dumps([w.as_dict() for w in self.pool.workers]))
+        else:
+            self.finish("ok" if ready else "no worker ready")
+
+
+def make_app(pool):
+    return tornado.web.Application([
+        (STREAM_PATH, StreamProxy, {"pool": pool}),
+        (HEALTH_PATH, HealthHandler, {"pool": pool}),
+        (r"/app/static/(.*)", StaticAssetHandler, {"path": str(STATIC_DIR)}),
+        (r".*", HttpProxy, {"pool": pool}),
+    ], websocket_ping_interval=30, compress_response=True)
+
+
+def ensure_snapshot():
+    # כל העובדים ממפים את אותו קובץ; כשאין תמונת מצב תקפה היא נבנית כאן פעם אחת
+    # ולא בכל עובד בנפרד. מכאן והלאה חוט הבנייה בונה ומפרסם כל גרסה חדשה
+    publish_store(get_store())
+    start_watcher(role="build")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard from several Streamlit processes behind one port")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("CPI_WORKERS", 0)) or os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--base-port", type=int, default=int(os.environ.get("CPI_WORKER_BASE_PORT", DEFAULT_BASE_PORT)))
+    parser.add_argument("--script", default="app.py")
+    parser.add_argument("--max-sessions", type=int, default=int(os.environ.get("CPI_WORKER_SESSIONS", 0)),
+                        help="open sessions per worker before it counts as saturated (0: no limit)")
+    parser.add_argument("--static-landing", action="store_true", default=os.environ.get("CPI_STATIC_LANDING") == "1",
+                        help="send new visitors the static edition of the dashboard")
+    args, streamlit_args = parser.parse_known_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    ensure_snapshot()
+    workers = [Worker(i, args.base_port + i, args.script, streamlit_args) for i in range(args.workers)]
+    pool = Pool(workers, args.max_sessions, args.static_landing)
+    make_app(pool).listen(args.port, args.host, xheaders=True)
+    logger.info("Proxying http://%s:%d to %d Streamlit workers", args.host, args.port, args.workers)
+
+    loop = IOLoop.current()
+    PeriodicCallback(pool.supervise, SUPERVISE_SECONDS * 1000).start()
+    loop.add_callback(pool.supervise)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: loop.add_callback_from_signal(loop.stop))
+    try:
+        loop.start()
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import argparse
+import gzip
+import hashlib
+import logging
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from cpi.api import (
+    QUERY_CACHE_SIZE, ApiQueryError, build_machine_ready_data, canonical_query, query_body, query_error_body
+)
+from cpi import metrics
+from cpi.cache import versioned
+from cpi.dashboard import get_calculated_contributions
+from cpi.models import dumps
+from cpi.store import get_store
+from cpi.warmup import is_ready, warm_up
+from cpi.watcher import start_watcher
+
+# ===================
+# שרת API עצמאי לנתוני הדשבורד: python -m cpi.server --port 8502
+# ===================
+# רץ לצד Streamlit ומשתמש באותו קוד טעינה וחישוב, בלי לפתוח סשן של Streamlit.
+# תגובה לנתיב מוכר או לשאילתה תקינה מחושבת פעם אחת לכל גרסת נתונים (גוף, גרסת
+# gzip ו-ETag) ונשמרת במטמון LRU; 404 ו-400 נבנים בכל פעם ולא נשמרים, כך שסורק
+# עם נתיבים או פרמטרים אקראיים לא מגדיל את הזיכרון.
+#
+#   GET /api                              מבנה machine_ready_data המלא
+#   GET /api/contributions                התרומות העיקריות לשינוי החודשי
+#   GET /api/groups                       רשימת הסדרות (קוד, שם, רמה, הורה)
+#   GET /api/groups/<code>                הסדרה המלאה של קוד
+#   GET /api/groups/<code>/latest         הרשומה האחרונה של קוד
+#   GET /api/groups/<code>/contributions  סדרת התרומה של קוד לשינוי החודשי
+#   GET /api/query?api=...                אותן שאילתות כמו ?api= בדשבורד (cpi/api.py)
+#   GET /healthz                          השרת חי
+#   GET /readyz                           200 כשגרסת הנתונים הנוכחית חוממה, אחרת 503
+#   GET /metrics                          מדדי התהליך בפורמט Prometheus (cpi/metrics.py)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8502
+GZIP_MIN_BYTES = 512
+# כמה תגובות לנתיבים נשמרות לכל גרסת נתונים; שאילתות /api/query לפי QUERY_CACHE_SIZE
+RENDER_CACHE_SIZE = 1024
+GROUP_VIEWS = (None, "latest", "contributions")
+
+
+class NotFound(Exception):
+    pass
+
+
+class Response:
+    def __init__(self, body, status=HTTPStatus.OK, content_type="application/json; charset=utf-8"):
+        self.status = status
+        self.content_type = content_type
+        self.body = body
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_body = gzip.compress(body, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+        # ETag חזק שונה לכל קידוד - אחרת מטמון עלול להגיש את הבתים של הקידוד השני
+        self.gzip_etag = f'"{digest}-gz"' if self.gzip_body is not None else None
+
+
+def _json(obj):
+    return dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _parse_code(raw):
+    try:
+        return int(raw)
+    except ValueError:
+        raise NotFound(raw)
+
+
+def _group_payload(store, code, view):
+    header = {"code": code, "name": store.name(code)}
+    if view is None:
+        return dict(header, data=store.records(code))
+    if view == "latest":
+        return dict(header, data=store.latest_record(code))
+    if view == "contributions":
+        return dict(header, data=[
+            {"year": r["year"], "month": r["month"], "contribution": r.get("contribution")}
+            for r in store.records(code)
+        ])
+
+
+def _groups_index(store):
+    tree = store.tree
+    groups = []
+    for code in store.codes:
+        entry = {"code": code, "name": store.name(code)}
+        if tree is not None and code in tree:
+            entry.update(level=tree.level[code], parent_code=tree.parent[code], has_children=not tree.is_leaf(code))
+        groups.append(entry)
+    return {"groups": groups}
+
+
+def resolve(store, path):
+    # נתיב -> מפתח קנוני של מסלול מוכר ("group", 120040, "latest"), או NotFound
+    parts = [p for p in path.split("/") if p]
+    if parts == ["api"]:
+        return ("api",)
+    if parts == ["api", "contributions"]:
+        return ("contributions",)
+    if parts == ["api", "groups"]:
+        return ("groups",)
+    if len(parts) in (3, 4) and parts[:2] == ["api", "groups"]:
+        code = _parse_code(parts[2])
+        view = parts[3] if len(parts) == 4 else None
+        if code in store and view in GROUP_VIEWS:
+            return ("group", code, view)
+    raise NotFound(path)
+
+
+def route(store, key):
+    kind = key[0]
+    if kind == "api":
+        return build_machine_ready_data(store)
+    if kind == "contributions":
+        return {"data": get_calculated_contributions(store)}
+    if kind == "groups":
+        return _groups_index(store)
+    return _group_payload(store, *key[1:])
+
+
+@versioned(maxsize=RENDER_CACHE_SIZE)
+def render(store, key):
+    # key מ-resolve בלבד, כך שרק מסלולים קיימים נכנסים למטמון
+    return Response(_json(route(store, key)))
+
+
+@versioned(maxsize=QUERY_CACHE_SIZE)
+def render_query(store, query):
+    # query קנוני (canonical_query); ApiQueryError עוברת למטפל ולא נשמרת
+    return Response(query_body(store, query).encode("utf-8"))
+
+
+def respond(store, path, query_string):
+    if path == "/api/query":
+        query = parse_qsl(query_string)
+        try:
+            return render_query(store, canonical_query(query))
+        except ApiQueryError as e:
+            return Response(query_error_body(e, query).encode("utf-8"), HTTPStatus.BAD_REQUEST)
+    try:
+        return render(store, resolve(store, path))
+    except NotFound:
+        return Response(_json({"error": "not found", "path": path}), HTTPStatus.NOT_FOUND)
+
+
+def _readiness(store):
+    ready = is_ready(store)
+    body = _json({"ready": ready, "version": store.version, "period": store.period_label(0)})
+    return Response(body, HTTPStatus.OK if ready else HTTPStatus.SERVICE_UNAVAILABLE)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "cpi-api/1"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def _handle(self, send_body):
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/") or "/"
+        if path == "/healthz":
+            self._send(Response(b"ok\n", content_type="text/plain; charset=utf-8"), send_body, cacheable=False)
+            return
+        if path == "/readyz":
+            self._send(_readiness(get_store()), send_body, cacheable=False)
+            return
+        if path == "/metrics":
+            body = metrics.render().encode("utf-8")
+            self._send(Response(body, content_type=metrics.CONTENT_TYPE), send_body, cacheable=False)
+            return
+
+        store = get_store()
+        response = respond(store, path, url.query)
+        self._send(response, send_body, data_version=store.version)
+
+    def _send(self, response, send_body, cacheable=True, data_version=None):
+        use_gzip = response.gzip_body is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        body, etag = (response.gzip_body, response.gzip_etag) if use_gzip else (response.body, response.etag)
+        if cacheable and response.status == HTTPStatus.OK and self._not_modified(response):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(response.status)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        if cacheable:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "public, max-age=60")
+            self.send_header("Access-Control-Allow-Origin", "*")
+        if data_version:
+            self.send_header("X-Data-Version", data_version[:12])
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _not_modified(self, response):
+        # כל אחד משני ה-ETag מתאר את אותו תוכן, ולכן שניהם מאשרים שהעותק של הלקוח עדכני
+        header = self.headers.get("If-None-Match")
+        if not header:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+        return "*" in tags or response.etag in tags or response.gzip_etag in tags
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Standalone HTTP API for the CPI dashboard data")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    # טעינת הנתונים וחימום המטמונים לפני קבלת בקשות, וטעינה מחדש ברקע כשהם משתנים
+    start_watcher()
+    store = get_store()
+    warm_up(store)
+    for path in ("/api", "/api/contributions", "/api/groups"):
+        render(store, resolve(store, path))
+    server = make_server(args.host, args.port)
+    logger.info("serving CPI API on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
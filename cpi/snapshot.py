@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from cpi.files import atomic_file
+from cpi.models import json_default
+
+# ===================
+# תמונת מצב בינארית של תיקיית data/
+# ===================
+# קובץ אחד: MAGIC | אורך כותרת (uint32) | כותרת JSON | מערכים גולמיים מיושרים ל-64 בתים.
+# המערכים נטענים ב-memmap לקריאה בלבד, כך שכמה תהליכים על אותו שרת חולקים
+# את אותם עמודים ב-page cache של מערכת ההפעלה.
+
+SNAPSHOT_PATH = Path("build/cpi_snapshot.bin")
+SOURCE_DIRS = ("main", "additional", "groups", "classification")
+
+MAGIC = b"CPISNAP\x00"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def source_files(data_dir):
+    data_dir = Path(data_dir)
+    files = []
+    for sub in SOURCE_DIRS:
+        files.extend(sorted((data_dir / sub).glob("*.json")))
+    return files
+
+
+def source_hash(data_dir):
+    digest = hashlib.sha256()
+    for file_path in source_files(data_dir):
+        digest.update(file_path.relative_to(data_dir).as_posix().encode("utf-8") + b"\0")
+        digest.update(file_path.read_bytes())
+    return digest.hexdigest()
+
+
+def source_manifest(data_dir):
+    # טביעה זולה (נתיב, גודל, זמן שינוי) - לזיהוי שינוי בקבצים בלי לקרוא אותם
+    digest = hashlib.sha256()
+    for sub in SOURCE_DIRS:
+        try:
+            entries = sorted(os.scandir(os.path.join(data_dir, sub)), key=lambda e: e.name)
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.name.endswith(".json"):
+                st = entry.stat()
+                digest.update(f"{sub}/{entry.name}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def snapshot_stamp(path):
+    # (גודל, זמן שינוי) של קובץ תמונת המצב, או None כשאין כזה
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_snapshot(path, header, arrays):
+    # header: מילון JSON חופשי; arrays: {שם: מערך numpy} שנכתבים אחרי הכותרת
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    blocks = {}
+    header = dict(header, format_version=FORMAT_VERSION, arrays=blocks)
+
+    # חישוב ההיסטים תלוי באורך הכותרת, שתלוי בהיסטים - מחשבים עד שמתייצב
+    header_bytes = b""
+    while True:
+        offset = _align(len(MAGIC) + 4 + len(header_bytes))
+        for name, a in arrays.items():
+            blocks[name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": offset}
+            offset = _align(offset + a.nbytes)
+        encoded = json.dumps(header, ensure_ascii=False, default=json_default).encode("utf-8")
+        # ההיסטים ב-encoded חושבו לפי אורך הכותרת הקודמת; כשהאורך זהה הם נכונים גם לה
+        converged = len(encoded) == len(header_bytes)
+        header_bytes = encoded
+        if converged:
+            break
+
+    with atomic_file(path) as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(4, "little"))
+        f.write(header_bytes)
+        for name, a in arrays.items():
+            f.write(b"\0" * (blocks[name]["offset"] - f.tell()))
+            f.write(a.tobytes())
+
+
+def read_snapshot(path):
+    path = Path(path)
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise SnapshotError(f"{path}: not a CPI snapshot")
+        header_len = int.from_bytes(f.read(4), "little")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+
+    if header.get("format_version") != FORMAT_VERSION:
+        raise SnapshotError(f"{path}: unsupported format version {header.get('format_version')}")
+
+    arrays = {}
+    for name, block in header["arrays"].items():
+        shape = tuple(block["shape"])
+        if 0 in shape:
+            arrays[name] = np.empty(shape, dtype=block["dtype"])
+        else:
+            arrays[name] = np.memmap(path, dtype=block["dtype"], mode="r", offset=block["offset"], shape=shape)
+    return header, arrays
@@ -0,0 +1,434 @@
+import json
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+
+from cpi.cache import carry_over, invalidate
+from cpi.classification import CLASSIFICATION_NAME, build_tree
+from cpi.metrics import STORE_LOAD_SECONDS, STORE_LOADS, observe_store
+from cpi.models import freeze
+from cpi.snapshot import (
+    SNAPSHOT_PATH, SnapshotError, read_snapshot, snapshot_stamp, source_files, source_hash, source_manifest,
+    write_snapshot
+)
+
+logger = logging.getLogger(__name__)
+
+# ===================
+# מאגר עמודתי של כל סדרות המדד בזיכרון
+# ===================
+# כל הסדרות (ראשי, מדדים נוספים וקבוצות) נשמרות במערך אחד:
+# values[שורת קוד, חודש, שדה], כשהחודש ה-0 הוא החודש האחרון (כמו data[0] בקבצים).
+# ערך חסר נשמר כ-NaN.
+
+DATA_DIR = Path("data")
+SERIES_DIRS = ("main", "additional", "groups")
+CLASSIFICATION_DIR = "classification"
+
+MAIN_CODE = 120010
+
+# טעינה מקבילית של קבצי הסדרות: CPI_LOAD_WORKERS (ברירת מחדל: מספר הליבות) ו-
+# CPI_LOAD_EXECUTOR = process (ברירת מחדל) | thread. json.load מחזיק את ה-GIL, ולכן
+# רק תהליכים מתפזרים על ליבות. בלי מספר עובדים מפורש (--workers או
+# CPI_LOAD_WORKERS), מתחת ל-PARALLEL_MIN_FILES העלות של הפעלת המאגר גבוהה
+# מהפרסור עצמו והטעינה נשארת סדרתית; מספר מפורש מכובד תמיד.
+LOAD_EXECUTORS = ("process", "thread")
+PARALLEL_MIN_FILES = 500
+
+FIELDS = (
+    "value",
+    "monthly_change",
+    "yearly_change",
+    "contribution",
+    "index_relative_to_2024_avg",
+    "seasonally_adjusted",
+)
+FIELD_INDEX = {field: i for i, field in enumerate(FIELDS)}
+
+
+def _to_py(x):
+    return None if np.isnan(x) else float(x)
+
+
+class Record:
+    # חודש אחד של סדרה בלי מילון: view לשורה במערך (בתמונת מצב - ישר מהקובץ הממופה)
+    # והשדות נקראים ממנה לפי שם. record.monthly_change במקום data['data'][0]['monthly_change'];
+    # שדה חסר (NaN) מחזיר None, ו-get מקבל ברירת מחדל כמו במילון
+    __slots__ = ("year", "month", "_values")
+
+    def __init__(self, year, month, values):
+        self.year = year
+        self.month = month
+        self._values = values
+
+    def __getattr__(self, field):
+        index = FIELD_INDEX.get(field)
+        if index is None:
+            raise AttributeError(field)
+        return _to_py(self._values[index])
+
+    def get(self, field, default=None):
+        if field in ("year", "month"):
+            return getattr(self, field)
+        value = getattr(self, field)
+        return default if value is None else value
+
+    def as_dict(self):
+        # בפורמט של רשומה בקבצי ה-JSON, לפלט ה-API
+        record = {"year": self.year, "month": self.month}
+        for field, x in zip(FIELDS, self._values.tolist()):
+            if not math.isnan(x):
+                record[field] = x
+        return record
+
+
+class SeriesView:
+    # סדרה אחת ב-store: שורה במערך, בלי עותק של הנתונים
+    __slots__ = ("store", "code", "row")
+
+    def __init__(self, store, code, row):
+        self.store = store
+        self.code = code
+        self.row = row
+
+    @property
+    def name(self):
+        return self.store.names[self.row]
+
+    def field(self, field, n=None):
+        return self.store.values[self.row, :n, FIELD_INDEX[field]]
+
+    def at(self, month=0):
+        # None כשאין לסדרה ערך בחודש הזה
+        values = self.store.values[self.row, month]
+        if np.isnan(values[0]):
+            return None
+        year, month_num = self.store.periods[month].tolist()
+        return Record(year, month_num, values)
+
+    def records(self, n=None):
+        # מהחדש לישן, רק לחודשים שבהם הסדרה קיימת
+        present = np.flatnonzero(~np.isnan(self.store.values[self.row, :n, 0]))
+        return tuple(self.at(month) for month in present.tolist())
+
+
+class CPIStore:
+    def __init__(self, codes, names, periods, values, classification=None, source_hash=None, base_hash=None):
+        self.codes = tuple(codes)
+        self.names = tuple(names)
+        # periods[i] = (שנה, חודש) של עמודת החודש i, מהחדש לישן
+        self.periods = periods
+        self.values = values
+        # המערכים משותפים לכל הסשנים (ובתמונת מצב - לכל התהליכים), לכן לקריאה בלבד
+        self.periods.setflags(write=False)
+        self.values.setflags(write=False)
+        # קבצי הסיווג לפי שם הקובץ (בלי סיומת)
+        self.classification = freeze(classification or {})
+        self.source_hash = source_hash
+        # ה-hash של קבצי data/ שמהם נבנה הבסיס; שונה מ-source_hash אחרי קליטת חודשים (cpi/ingest.py)
+        self.base_hash = base_hash or source_hash
+        # אחרי קליטה: {"parent": גרסה קודמת, "shift": חודשים חדשים, "touched": חודשים שעודכנו}
+        self.lineage = None
+        # רק ב-store שנבנה מקבצי JSON: ((נתיב, שניות), ...)
+        self.load_timings = ()
+        # טביעת הקבצים בזמן הטעינה, לזיהוי שינוי ב-data/
+        self.manifest = None
+        # מתי נבנתה גרסת הנתונים (לא מתי התהליך טען אותה), לגיל הגרסה במדדים:
+        # מכותרת תמונת המצב, מזמן השינוי של קובץ הנתונים החדש ביותר, או עכשיו (קליטה)
+        self.built_at = time.time()
+        self.index = {code: row for row, code in enumerate(self.codes)}
+
+    @property
+    def version(self):
+        return self.source_hash
+
+    @cached_property
+    def period_index(self):
+        return {(year, month): i for i, (year, month) in enumerate(self.periods.tolist())}
+
+    def month_index(self, year, month):
+        return self.period_index.get((year, month))
+
+    def period_label(self, month):
+        # עמודת חודש -> YYYY-MM, הפורמט של ?month= ושל ה-API
+        year, month_num = self.periods[month].tolist()
+        return f"{year}-{month_num:02d}"
+
+    def find_period(self, label):
+        # YYYY-MM -> עמודת החודש, או None לתווית לא תקינה או חודש שאין לו נתונים
+        try:
+            year, month = (int(part) for part in label.split("-"))
+        except ValueError:
+            return None
+        return self.month_index(year, month)
+
+    @cached_property
+    def tree(self):
+        return build_tree(self.classification.get(CLASSIFICATION_NAME))
+
+    def __contains__(self, code):
+        return code in self.index
+
+    def __len__(self):
+        return len(self.codes)
+
+    def row(self, code):
+        return self.index.get(code)
+
+    def view(self, code):
+        row = self.index.get(code)
+        return None if row is None else SeriesView(self, code, row)
+
+    def record(self, code, month=0):
+        # Record של קוד בעמודת חודש, או None כשהקוד חסר או שאין לו ערך בחודש
+        view = self.view(code)
+        return view.at(month) if view else None
+
+    def name(self, code, default=None):
+        row = self.index.get(code)
+        return default if row is None else self.names[row]
+
+    def series(self, code, field, n=None):
+        row = self.index.get(code)
+        if row is None:
+            return None
+        return self.values[row, :n, FIELD_INDEX[field]]
+
+    def latest(self, code, field, month=0):
+        row = self.index.get(code)
+        if row is None:
+            return None
+        return _to_py(self.values[row, month, FIELD_INDEX[field]])
+
+    def column(self, codes, field, month=0):
+        # שליפה וקטורית של שדה אחד עבור רשימת קודים; קוד שלא קיים מקבל NaN
+        rows = np.array([self.index.get(code, -1) for code in codes], dtype=np.intp)
+        out = np.full(len(rows), np.nan)
+        found = rows >= 0
+        out[found] = self.values[rows[found], month, FIELD_INDEX[field]]
+        return out
+
+    def latest_record(self, code, month=0):
+        # מילון בפורמט של קבצי ה-JSON, לפלט ה-API; הדשבורד קורא את view(code).at(month)
+        record = self.record(code, month)
+        return record.as_dict() if record else None
+
+    def records(self, code, n=None):
+        # רשומות בפורמט של קבצי ה-JSON (מהחדש לישן), רק לחודשים שבהם הסדרה קיימת
+        view = self.view(code)
+        if view is None:
+            return []
+        return [record.as_dict() for record in view.records(n)]
+
+
+def period_key(year, month):
+    return year * 12 + (month - 1)
+
+
+def load_classification(data_dir=DATA_DIR):
+    classification = {}
+    for file_path in sorted((Path(data_dir) / CLASSIFICATION_DIR).glob("*.json")):
+        with open(file_path, "r", encoding="utf-8") as f:
+            classification[file_path.stem] = json.load(f)
+    return classification
+
+
+def discover_series_files(data_dir=DATA_DIR):
+    # סריקה אחת לכל תיקיית סדרות; הסדר (תיקייה, שם קובץ) קובע את סדר השורות ב-store
+    files = []
+    for sub in SERIES_DIRS:
+        try:
+            entries = os.scandir(os.path.join(data_dir, sub))
+        except FileNotFoundError:
+            continue
+        with entries:
+            names = sorted(e.name for e in entries if e.name.startswith("cpi_") and e.name.endswith(".json"))
+        files.extend(os.path.join(data_dir, sub, name) for name in names)
+    return files
+
+
+def parse_series_file(path):
+    # (קוד, שם, מפתחות חודשים, בלוק ערכים, שניות) - או None לקובץ בלי רשומות
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    records = data.get("data") or []
+    if not records:
+        return None
+    return (
+        int(data["index_id"]),
+        data.get("name", str(data["index_id"])),
+        np.array([period_key(r["year"], r["month"]) for r in records]),
+        np.array([[r.get(field) for field in FIELDS] for r in records], dtype=np.float64),
+        time.perf_counter() - start,
+    )
+
+
+def parse_series_files(paths, workers=None, executor=None):
+    # התוצאות חוזרות בסדר הקבצים, בלי תלות בסדר שבו העובדים סיימו
+    explicit = workers or int(os.environ.get("CPI_LOAD_WORKERS", 0))
+    workers = explicit or os.cpu_count() or 1
+    executor = executor or os.environ.get("CPI_LOAD_EXECUTOR", "process")
+    if executor not in LOAD_EXECUTORS:
+        raise ValueError(f"unknown executor {executor!r}, expected one of {LOAD_EXECUTORS}")
+    if workers <= 1 or (not explicit and len(paths) < PARALLEL_MIN_FILES):
+        return [parse_series_file(path) for path in paths]
+    if executor == "thread":
+        with ThreadPoolExecutor(workers) as pool:
+            return list(pool.map(parse_series_file, paths))
+    # spawn ולא fork: התהליך הקורא (Streamlit, שרת ה-API) מריץ חוטים
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(parse_series_file, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+
+def build_store(data_dir=DATA_DIR, source=None, workers=None, executor=None):
+    data_dir = Path(data_dir)
+    codes, names, keys, blocks, timings = [], [], [], [], []
+
+    paths = discover_series_files(data_dir)
+    for path, parsed in zip(paths, parse_series_files(paths, workers, executor)):
+        if parsed is None:
+            continue
+        code, name, series_keys, block, elapsed = parsed
+        codes.append(code)
+        names.append(name)
+        keys.append(series_keys)
+        blocks.append(block)
+        timings.append((path, elapsed))
+
+    all_keys = np.unique(np.concatenate(keys))[::-1] if keys else np.array([], dtype=int)
+    values = np.full((len(codes), len(all_keys), len(FIELDS)), np.nan)
+
+    # ציר החודשים יורד, לכן מחפשים על ההיפוך העולה שלו
+    ascending = all_keys[::-1]
+    for row, (series_keys, block) in enumerate(zip(keys, blocks)):
+        positions = len(all_keys) - 1 - np.searchsorted(ascending, series_keys)
+        values[row, positions] = block
+
+    periods = np.stack([all_keys // 12, all_keys % 12 + 1], axis=1) if len(all_keys) else np.empty((0, 2), dtype=int)
+    store = CPIStore(codes, names, periods, values, load_classification(data_dir), source)
+    store.built_at = max((p.stat().st_mtime for p in source_files(data_dir)), default=store.built_at)
+    # זמן הפרסור של כל קובץ, לדוח של python -m cpi.build --timings
+    store.load_timings = tuple(timings)
+    return store
+
+
+def save_snapshot(store, path=SNAPSHOT_PATH):
+    header = {
+        "source_hash": store.source_hash,
+        "base_hash": store.base_hash,
+        "lineage": store.lineage,
+        "built_at": store.built_at,
+        "codes": list(store.codes),
+        "names": list(store.names),
+        "fields": list(FIELDS),
+        "classification": store.classification,
+    }
+    write_snapshot(path, header, {"periods": store.periods, "values": store.values})
+
+
+def load_snapshot(path=SNAPSHOT_PATH, expected_hash=None):
+    header, arrays = read_snapshot(path)
+    if tuple(header["fields"]) != FIELDS:
+        raise SnapshotError(f"{path}: field layout {header['fields']} does not match {list(FIELDS)}")
+    base_hash = header.get("base_hash") or header["source_hash"]
+    if expected_hash is not None and base_hash != expected_hash:
+        raise SnapshotError(f"{path}: stale snapshot, source hash {base_hash[:12]} != {expected_hash[:12]}")
+    store = CPIStore(
+        header["codes"], header["names"], arrays["periods"], arrays["values"],
+        header["classification"], header["source_hash"], base_hash
+    )
+    store.lineage = header.get("lineage")
+    # תמונת מצב ישנה בלי built_at: זמן הכתיבה שלה
+    store.built_at = header.get("built_at") or os.stat(path).st_mtime
+    return store
+
+
+def current_manifest(data_dir=DATA_DIR, snapshot_path=SNAPSHOT_PATH):
+    # קבצי data/ ותמונת המצב - קליטת חודש כותבת רק את תמונת המצב
+    return source_manifest(data_dir), snapshot_stamp(snapshot_path)
+
+
+def load_store(data_dir=DATA_DIR, snapshot_path=SNAPSHOT_PATH):
+    # עדיפות לתמונת מצב בינארית תקפה; אחרת חוזרים לקבצי ה-JSON
+    start = time.perf_counter()
+    manifest = current_manifest(data_dir, snapshot_path)
+    current_hash = source_hash(data_dir)
+    store = None
+    source = "snapshot"
+    if Path(snapshot_path).exists():
+        try:
+            store = load_snapshot(snapshot_path, expected_hash=current_hash)
+        except (SnapshotError, OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring snapshot, falling back to JSON: %s", e)
+    if store is None:
+        source = "json"
+        store = build_store(data_dir, current_hash)
+    store.manifest = manifest
+    STORE_LOADS.inc(source=source)
+    STORE_LOAD_SECONDS.observe(time.perf_counter() - start, source=source)
+    return store
+
+
+_store = None
+_store_lock = threading.Lock()
+# כשחוט הרקע של cpi/watcher.py פעיל, הוא זה שטוען ומחליף גרסאות ולא get_store
+_watched = False
+
+
+def set_watched(watched):
+    global _watched
+    _watched = watched
+
+
+def get_store():
+    # בדיקת הטביעה זולה (stat בלבד); טעינה מחדש רק כשקובץ ב-data/ השתנה
+    global _store
+    store = _store
+    if store is not None and (_watched or store.manifest == current_manifest()):
+        return store
+    with _store_lock:
+        if _store is None or _store.manifest != current_manifest():
+            fresh = load_store()
+            if _store is not None and fresh.version == _store.version:
+                # רק זמני שינוי זזו - התוכן זהה, אין צורך להחליף גרסה
+                _store.manifest = fresh.manifest
+            else:
+                _swap(fresh)
+        return _store
+
+
+def _swap(fresh):
+    # נקרא תחת _store_lock. כשהגרסה החדשה היא קליטה מעל הנוכחית, תוצאות של
+    # חודשים שלא השתנו עוברות אליה במקום להיות מחושבות מחדש
+    global _store
+    lineage = fresh.lineage
+    if _store is not None and lineage and lineage["parent"] == _store.version:
+        carry_over(_store.version, fresh.version, lineage["shift"], lineage["touched"])
+    _store = fresh
+    observe_store(fresh)
+
+
+def swap_store(fresh):
+    # החלפה אטומית ל-store שנבנה בתהליך הזה (למשל אחרי קליטת חודש)
+    with _store_lock:
+        _swap(fresh)
+        return _store
+
+
+def reload_store():
+    # טעינה מחדש מפורשת: החלפה אטומית של ה-store וריקון כל התוצאות הנגזרות
+    global _store
+    with _store_lock:
+        _store = load_store()
+        invalidate()
+        observe_store(_store)
+        return _store
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from types import MappingProxyType
+
+from cpi.api import get_json_ld
+from cpi.dashboard import get_dashboard_snapshot, month_options
+from cpi.files import write_atomic
+from cpi.models import Contribution, CoreTrend, DashboardSnapshot, SelectedItem, TableRow, dumps
+from cpi.snapshot import SNAPSHOT_PATH
+from cpi.store import DATA_DIR, current_manifest
+
+logger = logging.getLogger(__name__)
+
+# ===================
+# תקציר השחרור האחרון לציור הראשון של העמוד
+# ===================
+# קובץ JSON קטן שנכתב בשלב הבנייה (python -m cpi.build) ובקליטת חודש
+# (python -m cpi.ingest), עם כל מה שהחלק העליון של העמוד צריך לחודש האחרון:
+# תמונת המצב של הדשבורד (רשומת המדד הראשי, שורות הטבלה, התרומות המדורגות,
+# התורמים העיקריים, הסעיף הבולט בכל קבוצה ברמה 1 ומגמת הליבה), רשימת החודשים
+# לבחירה וה-JSON-LD. app.py מצייר ממנו את הפתיח, התרומות והסעיפים הנבחרים בלי
+# לחשב אותם, כל עוד התקציר נבנה מאותה גרסה של ה-store שהריצה מגישה. התקציר תקף
+# רק כשהטביעה של data/ ושל תמונת המצב זהה לזו שנשמרה בו.
+
+SUMMARY_PATH = Path("build/cpi_summary.json")
+FORMAT_VERSION = 1
+
+
+class ReleaseSummary:
+    # version זהה לגרסת ה-store שממנו נבנה, כך שתוצאות @versioned נחלקות בין השניים
+    def __init__(self, version, manifest, months, snapshot, json_ld):
+        self.version = version
+        self.manifest = manifest
+        self.months = months
+        self.snapshot = snapshot
+        self.json_ld = json_ld
+
+
+def build_summary(store, manifest):
+    return {
+        "format": FORMAT_VERSION,
+        "version": store.version,
+        "manifest": manifest,
+        "months": month_options(store),
+        "snapshot": get_dashboard_snapshot(store),
+        "json_ld": get_json_ld(store),
+    }
+
+
+def save_summary(store, path=SUMMARY_PATH, data_dir=DATA_DIR, snapshot_path=SNAPSHOT_PATH):
+    # נכתב אחרי תמונת המצב, כדי שהטביעה השמורה תכלול אותה
+    data = dumps(build_summary(store, current_manifest(data_dir, snapshot_path)), ensure_ascii=False)
+    write_atomic(path, data)
+
+
+def _manifest(raw):
+    # JSON מחזיר רשימות; current_manifest מחזיר (hash, (גודל, זמן שינוי) או None)
+    source, stamp = raw
+    return source, tuple(stamp) if stamp else None
+
+
+def _snapshot(data):
+    trend = data["core_trend"]
+    return DashboardSnapshot(
+        month=data["month"],
+        period=data["period"],
+        main=MappingProxyType(data["main"]),
+        table=tuple(TableRow(**row) for row in data["table"]),
+        contributions=tuple(Contribution(**c) for c in data["contributions"]),
+        top_contributors=tuple(Contribution(**c) for c in data["top_contributors"]),
+        selected_items=tuple(SelectedItem(**item) for item in data["selected_items"]),
+        core_trend=CoreTrend(**trend) if trend else None
+    )
+
+
+def load_summary(path=SUMMARY_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path}: summary format {data.get('format')} != {FORMAT_VERSION}")
+    return ReleaseSummary(
+        data["version"],
+        _manifest(data["manifest"]),
+        tuple((month, label) for month, label in data["months"]),
+        _snapshot(data["snapshot"]),
+        data["json_ld"]
+    )
+
+
+_summary = None
+_summary_stamp = None
+_summary_lock = threading.Lock()
+# תקציר שהוצמד ידנית (מדידות על נתונים אחרים) מחליף את הקובץ ואת בדיקת הטביעה
+_pinned = None
+
+
+def pin_summary(summary):
+    # None מחזיר את הקריאה מהקובץ
+    global _pinned
+    _pinned = summary
+
+
+def get_summary(path=SUMMARY_PATH):
+    # התקציר של התהליך, או None כשאין קובץ, הוא לא קריא או שהנתונים השתנו מאז שנכתב
+    global _summary, _summary_stamp
+    if _pinned is not None:
+        return _pinned
+    try:
+        stamp = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _summary_lock:
+        if stamp != _summary_stamp:
+            _summary_stamp = stamp
+            try:
+                _summary = load_summary(path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning("Ignoring release summary: %s", e)
+                _summary = None
+        summary = _summary
+    if summary is None or summary.manifest != current_manifest():
+        return None
+    return summary
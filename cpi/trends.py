@@ -0,0 +1,132 @@
+import numpy as np
+
+from cpi.cache import versioned
+from cpi.models import CoreTrend, freeze
+
+# ===================
+# מגמת מדדי הליבה
+# ===================
+# קצב שינוי שנתי מנורמל, מנוכה עונתית, על חלון קצר (3 חודשים) של המדדים ללא
+# דיור וללא דיור, ירקות ופירות. המספרים שמוצגים בעמוד וב-API הם הפרסום הרשמי
+# מ-data/classification/core_trends.json (רשומה לכל חודש שפורסם), ולא חישוב:
+# הניכוי העונתי הרשמי מתחשב גם בחגים שנודדים בין ספטמבר לאוקטובר, וגורם עונתי
+# קבוע לכל חודש קלנדרי לא משחזר אותו. חודש בלי רשומה מקבל None ("-" בעמוד).
+#
+# core_trend_rates הוא הקירוב מתוך data/additional (לכל החודשים בבת אחת, לפי
+# גרסת הנתונים): מכל שינוי חודשי מופחת הגורם העונתי של אותו חודש קלנדרי - כמה
+# השינוי הממוצע שלו בכל ההיסטוריה חורג מהשינוי החודשי הממוצע. python -m cpi.trends
+# משווה אותו לפרסום לכל חודש שיש בו רשומה.
+
+CORE_TREND_CODES = {
+    "without_housing": 110040,
+    "without_housing_fruit_vegetables": 120030,
+}
+TREND_WINDOW = 3
+# שם הקובץ (בלי סיומת) ב-data/classification
+PUBLISHED_NAME = "core_trends"
+
+MONTH_NAMES_HEBREW = {
+    1: "ינואר", 2: "פברואר", 3: "מרץ", 4: "אפריל",
+    5: "מאי", 6: "יוני", 7: "יולי", 8: "אוגוסט",
+    9: "ספטמבר", 10: "אוקטובר", 11: "נובמבר", 12: "דצמבר"
+}
+
+
+def seasonally_adjusted_changes(monthly_change, calendar_months):
+    # גורם עונתי לכל חודש קלנדרי = ממוצע השינויים החודשיים שלו פחות הממוצע של
+    # כל החודשים הקלנדריים (NaN לא נספר), כך שסכום הגורמים על פני שנה הוא אפס
+    present = ~np.isnan(monthly_change)
+    index = calendar_months - 1
+    totals = np.bincount(index[present], weights=monthly_change[present], minlength=12)
+    counts = np.bincount(index[present], minlength=12)
+    observed = counts > 0
+    means = np.divide(totals, counts, out=np.zeros(12), where=observed)
+    factors = np.where(observed, means - means[observed].mean(), 0.0) if observed.any() else means
+    return monthly_change - factors[index]
+
+
+def annualized_rates(monthly_change, window):
+    # rates[m] = קצב שנתי של השינוי המצטבר בחודשים m..m+window-1 (0 = האחרון)
+    log_growth = np.log1p(monthly_change / 100)
+    cumulative = np.concatenate(([0.0], np.cumsum(log_growth)))
+    rates = np.full(len(monthly_change), np.nan)
+    if len(monthly_change) >= window:
+        total = cumulative[window:] - cumulative[:-window]
+        rates[:len(total)] = np.expm1(total * 12 / window) * 100
+    return rates
+
+
+def period_label(store, month, window):
+    # "אוגוסט-נובמבר 2025": מחודש הבסיס שלפני החלון ועד חודש המגמה
+    end_year, end_month = store.periods[month].tolist()
+    start_year, start_month = store.periods[month + window].tolist()
+    if start_year == end_year:
+        return f"{MONTH_NAMES_HEBREW[start_month]}-{MONTH_NAMES_HEBREW[end_month]} {end_year}"
+    return f"{MONTH_NAMES_HEBREW[start_month]} {start_year}-{MONTH_NAMES_HEBREW[end_month]} {end_year}"
+
+
+@versioned
+def core_trend_rates(store, window=TREND_WINDOW):
+    # {שם: מערך קצבים לכל עמודת חודש}; קוד חסר או חלון לא שלם נותנים NaN
+    calendar_months = store.periods[:, 1]
+    rates = {}
+    for key, code in CORE_TREND_CODES.items():
+        monthly_change = store.series(code, "monthly_change")
+        if monthly_change is None:
+            rates[key] = np.full(len(store.periods), np.nan)
+        else:
+            adjusted = seasonally_adjusted_changes(monthly_change, calendar_months)
+            rates[key] = annualized_rates(adjusted, window)
+        rates[key].setflags(write=False)
+    return freeze(rates)
+
+
+@versioned
+def published_core_trends(store):
+    # (חלון, {(שנה, חודש): {שם: ערך}}) מהפרסום הרשמי; בלי קובץ - מילון ריק
+    published = store.classification.get(PUBLISHED_NAME) or {}
+    trends = {
+        (r["year"], r["month"]): {key: float(r[key]) for key in CORE_TREND_CODES}
+        for r in published.get("data", ())
+    }
+    return published.get("window", TREND_WINDOW), freeze(trends)
+
+
+@versioned
+def get_core_trend(store, month=0):
+    window, trends = published_core_trends(store)
+    if month + window >= len(store.periods):
+        return None
+    values = trends.get(tuple(store.periods[month].tolist()))
+    if values is None:
+        return None
+    return CoreTrend(
+        without_housing=values["without_housing"],
+        without_housing_fruit_vegetables=values["without_housing_fruit_vegetables"],
+        period=period_label(store, month, window),
+        window=window
+    )
+
+
+# ===================
+# השוואה לפרסום: python -m cpi.trends
+# ===================
+
+def main():
+    from cpi.store import get_store
+
+    store = get_store()
+    window, trends = published_core_trends(store)
+    rates = core_trend_rates(store, window)
+    print(f"{'month':<8} " + " ".join(f"{key:>34}" for key in CORE_TREND_CODES))
+    for (year, month_num), values in sorted(trends.items(), reverse=True):
+        month = store.month_index(year, month_num)
+        cells = []
+        for key in CORE_TREND_CODES:
+            computed = rates[key][month] if month is not None else np.nan
+            cells.append(f"published {values[key]:5.1f}  computed {computed:5.1f}")
+        print(f"{year}-{month_num:02d}  " + " ".join(f"{cell:>34}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
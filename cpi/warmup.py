@@ -0,0 +1,109 @@
+import argparse
+import logging
+import sys
+import threading
+import time
+
+from cpi.api import build_machine_ready_data, get_api_body, get_api_json, get_json_ld
+from cpi.assets import DASHBOARD_ICONS, get_assets, get_static_assets
+from cpi.charts import CHARTS, figure_spec
+from cpi.dashboard import get_dashboard_snapshot, get_sorted_contributions
+from cpi.store import MAIN_CODE, get_store
+from cpi.summary import get_summary
+
+logger = logging.getLogger(__name__)
+
+# ===================
+# חימום בעליית התהליך: python -m cpi.warmup
+# ===================
+# טוען את הנתונים וממלא את כל המטמונים שביקור ראשון צריך (תרומות, סעיפים נבחרים,
+# טבלה, גרפים, api.json ואייקונים) לפני שהשרת מקבל תנועה. המטמונים שייכים לתהליך,
+# ולכן החימום רץ בתוך התהליך שמגיש:
+#   python -m cpi.warmup                         חימום ובדיקה בלבד (קוד יציאה 1 בכישלון)
+#   python -m cpi.warmup --run app.py [דגלים]    חימום ואז streamlit run באותו תהליך
+# שרת ה-API מחמם בעצמו ומחזיר את המצב ב-GET /readyz; ב-Streamlit הנתיב
+# /_stcore/health עולה רק אחרי שהחימום הסתיים.
+
+
+class StoreValidationError(Exception):
+    pass
+
+
+def validate_store(store):
+    # בדיקות מינימליות לפני שה-store מוצג למשתמשים
+    if not len(store.periods):
+        raise StoreValidationError("store has no months")
+    if MAIN_CODE not in store:
+        raise StoreValidationError(f"main index {MAIN_CODE} is missing")
+    if store.record(MAIN_CODE) is None:
+        raise StoreValidationError(f"main index {MAIN_CODE} has no value for {store.period_label(0)}")
+    if store.tree is None:
+        raise StoreValidationError("classification tree is missing")
+
+
+# שלבי החימום לפי הסדר: (שם, פונקציה של store)
+WARMUP_STEPS = (
+    ("validate", validate_store),
+    ("sections", lambda store: get_dashboard_snapshot(store)),
+    ("contributions", lambda store: [get_sorted_contributions(store, d) for d in (False, True)]),
+    ("charts", lambda store: [figure_spec(store, name) for name in CHARTS]),
+    ("api", lambda store: (build_machine_ready_data(store), get_api_json(store), get_json_ld(store), get_api_body(store))),
+    ("icons", lambda store: (get_assets().sprite_sheet(DASHBOARD_ICONS), get_static_assets())),
+    ("summary", lambda store: get_summary()),
+)
+
+# גרסאות הנתונים שהחימום שלהן הושלם בתהליך הזה
+_warmed = set()
+_warmed_lock = threading.Lock()
+
+
+def warm_up(store):
+    # מחזיר {שלב: שניות}; חריגה בשלב כלשהו עוצרת והגרסה לא מסומנת כמוכנה
+    timings = {}
+    for name, step in WARMUP_STEPS:
+        start = time.perf_counter()
+        step(store)
+        timings[name] = time.perf_counter() - start
+    with _warmed_lock:
+        _warmed.add(store.version)
+    return timings
+
+
+def is_ready(store=None):
+    store = store or get_store()
+    with _warmed_lock:
+        return store.version in _warmed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load the CPI data and fill every cache before serving")
+    parser.add_argument("--run", metavar="SCRIPT", help="then start `streamlit run SCRIPT` in this process")
+    args, streamlit_args = parser.parse_known_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    start = time.perf_counter()
+    try:
+        if args.run:
+            # חוט הטעינה מחדש עולה לפני החימום, כמו ש-app.py היה מעלה אותו בריצה הראשונה
+            from cpi.metrics import start_metrics
+            from cpi.watcher import start_watcher
+            start_watcher()
+            start_metrics()
+        store = get_store()
+        timings = warm_up(store)
+    except Exception:
+        logger.exception("Warm-up failed")
+        sys.exit(1)
+    steps = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items())
+    logger.info("Warm for data version %s in %.0f ms (%s)", store.version[:12], (time.perf_counter() - start) * 1000, steps)
+
+    if args.run:
+        # Streamlit מריץ את הסקריפט בתהליך הזה, כך ש-cpi.* והמטמונים שלהם כבר טעונים
+        from streamlit.web import cli as streamlit_cli
+
+        sys.argv = ["streamlit", "run", args.run, *streamlit_args]
+        streamlit_cli.main()
+
+
+if __name__ == "__main__":
+    main()
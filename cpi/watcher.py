@@ -0,0 +1,210 @@
+import logging
+import os
+import threading
+import time
+
+from cpi.api import publish_api
+from cpi.export import publish_page
+from cpi.snapshot import SNAPSHOT_PATH, snapshot_stamp
+from cpi.store import (
+    DATA_DIR, current_manifest, get_store, load_snapshot, load_store, save_snapshot, set_watched, swap_store
+)
+from cpi.summary import SUMMARY_PATH, save_summary
+from cpi.warmup import warm_up
+
+logger = logging.getLogger(__name__)
+
+# ===================
+# טעינה מחדש ברקע כשקבצי data/ או תמונת המצב משתנים
+# ===================
+# חוט רקע אחד לכל תהליך מזהה שינוי (אירועי מערכת הקבצים דרך watchdog, או
+# בדיקת טביעה כל interval שניות), מחכה שהקבצים יתייצבו, בונה store חדש,
+# מאמת אותו, מחמם את המטמון לגרסה החדשה ורק אז מחליף. עד ההחלפה כל הריצות
+# מקבלות את ה-store הקודם, ומכיוון שכל ריצה לוקחת store אחד בתחילתה אין עמוד
+# שמערבב שתי גרסאות. כשהחוט פעיל get_store לא טוען מחדש בעצמו.
+# האימות והחימום הם אותם שלבים של חימום העלייה (cpi/warmup.py).
+#
+# התפקיד קובע מי בונה ומי רק ממפה:
+#   serve   תהליך יחיד (ברירת מחדל): טוען מ-data/ או מתמונת המצב, מחמם, מחליף,
+#           ושומר ומפרסם כמו build
+#   build   ה-proxy (cpi/proxy.py): כשקבצי data/ השתנו בונה פעם אחת את תמונת
+#           המצב ואת תקציר השחרור, ומפרסם את static/api.json ואת המהדורה
+#           הסטטית; לא מגיש ולכן לא מחמם
+#   follow  עובדים מאחורי ה-proxy ושרת ה-API לצידו: עוקבים רק אחרי
+#           build/cpi_snapshot.bin וממפים אותו מחדש כשהוא מוחלף - בלי לפרסר
+#           JSON ובלי לכתוב לדיסק
+#
+# הגדרות: CPI_WATCH = auto (ברירת מחדל) | watchdog | poll | off
+#         CPI_WATCH_INTERVAL = שניות בין בדיקות (ברירת מחדל 2)
+#         CPI_WATCH_ROLE = serve (ברירת מחדל) | build | follow
+
+WATCH_MODES = ("auto", "watchdog", "poll", "off")
+WATCH_ROLES = ("serve", "build", "follow")
+DEFAULT_INTERVAL = 2.0
+# כמה זמן הטביעה צריכה להישאר קבועה לפני טעינה - פרסום כותב 150+ קבצים ברצף
+SETTLE_SECONDS = 1.0
+
+
+def publish_store(store, data_dir=DATA_DIR, snapshot_path=SNAPSHOT_PATH, summary_path=SUMMARY_PATH):
+    # store שנבנה מ-JSON נשמר כתמונת מצב משותפת ולצידו תקציר השחרור (אחריה, כדי
+    # שהטביעה שבו תכלול אותה); אחר כך static/api.json והמהדורה הסטטית
+    if store.load_timings:
+        save_snapshot(store, snapshot_path)
+        save_summary(store, summary_path, data_dir, snapshot_path)
+        store.manifest = current_manifest(data_dir, snapshot_path)
+        logger.info("Wrote the shared snapshot for data version %s", store.version[:12])
+    publish_api(store)
+    publish_page(store)
+
+
+class StoreWatcher(threading.Thread):
+    def __init__(self, data_dir=DATA_DIR, snapshot_path=SNAPSHOT_PATH, mode="auto",
+                 interval=DEFAULT_INTERVAL, role="serve"):
+        super().__init__(name="cpi-store-watcher", daemon=True)
+        if mode not in WATCH_MODES:
+            raise ValueError(f"unknown watch mode {mode!r}, expected one of {WATCH_MODES}")
+        if role not in WATCH_ROLES:
+            raise ValueError(f"unknown watch role {role!r}, expected one of {WATCH_ROLES}")
+        self.data_dir = data_dir
+        self.snapshot_path = snapshot_path
+        self.mode = mode
+        self.interval = interval
+        self.role = role
+        self._changed = threading.Event()
+        self._stopped = threading.Event()
+        self._observer = None
+        self._failed_manifest = None
+
+    def _start_observer(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            if self.mode == "watchdog":
+                raise
+            return False
+
+        changed = self._changed
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                changed.set()
+
+        observer = Observer()
+        if self.role != "follow":
+            observer.schedule(Handler(), str(self.data_dir), recursive=True)
+        snapshot_dir = os.path.dirname(os.path.abspath(self.snapshot_path))
+        if os.path.isdir(snapshot_dir):
+            observer.schedule(Handler(), snapshot_dir, recursive=False)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        return True
+
+    def _settled_manifest(self):
+        # מחכה שהטביעה לא תשתנה במשך SETTLE_SECONDS
+        manifest = current_manifest(self.data_dir, self.snapshot_path)
+        while not self._stopped.wait(SETTLE_SECONDS):
+            latest = current_manifest(self.data_dir, self.snapshot_path)
+            if latest == manifest:
+                return manifest
+            manifest = latest
+        return None
+
+    def _load_snapshot(self):
+        # תמונת המצב מוחלפת אטומית (cpi/files.py), כך שאין צורך לחכות שתתייצב
+        fresh = load_snapshot(self.snapshot_path)
+        fresh.manifest = current_manifest(self.data_dir, self.snapshot_path)
+        return fresh
+
+    def refresh(self):
+        current = get_store()
+        if self.role == "follow":
+            # current.manifest[1] היא טביעת תמונת המצב בזמן הטעינה
+            stamp = snapshot_stamp(self.snapshot_path)
+            if stamp is None or stamp == current.manifest[1] or stamp == self._failed_manifest:
+                return False
+            manifest = stamp
+        else:
+            if current_manifest(self.data_dir, self.snapshot_path) == current.manifest:
+                return False
+            manifest = self._settled_manifest()
+            if manifest is None or manifest == current.manifest or manifest == self._failed_manifest:
+                return False
+
+        start = time.perf_counter()
+        try:
+            fresh = self._load_snapshot() if self.role == "follow" else load_store(self.data_dir, self.snapshot_path)
+            if fresh.version == current.version:
+                current.manifest = fresh.manifest
+                return False
+            if self.role != "build":
+                warm_up(fresh)
+        except Exception:
+            # ה-store הנוכחי ממשיך לשרת; ננסה שוב רק כשהקבצים ישתנו שוב
+            self._failed_manifest = manifest
+            logger.exception("Keeping data version %s, reload failed", current.version[:12])
+            return False
+
+        swap_store(fresh)
+        self._failed_manifest = None
+        logger.info(
+            "Swapped data version %s -> %s (%s, %.0f ms)",
+            current.version[:12], fresh.version[:12], fresh.period_label(0), (time.perf_counter() - start) * 1000
+        )
+        if self.role != "follow":
+            try:
+                publish_store(fresh, self.data_dir, self.snapshot_path)
+            except OSError:
+                logger.exception("Could not publish data version %s", fresh.version[:12])
+        return True
+
+    def start(self):
+        # ה-observer עולה כאן ולא בחוט, כך ש-CPI_WATCH=watchdog בלי החבילה נכשל אצל הקורא
+        watching = self.mode != "poll" and self._start_observer()
+        logger.info(
+            "Watching %s for changes (%s, %s)", self.snapshot_path if self.role == "follow" else self.data_dir,
+            self.role, "watchdog" if watching else f"poll every {self.interval}s"
+        )
+        super().start()
+
+    def run(self):
+        while not self._stopped.is_set():
+            # עם watchdog מחכים לאירוע; הבדיקה התקופתית נשארת כגיבוי לאירועים שהוחמצו
+            self._changed.wait(self.interval)
+            self._changed.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Store watcher iteration failed")
+
+    def stop(self):
+        self._stopped.set()
+        self._changed.set()
+        if self._observer is not None:
+            self._observer.stop()
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def start_watcher(mode=None, interval=None, role=None):
+    # חוט אחד לכל תהליך; קריאות נוספות (למשל מכל ריצה של app.py) מחזירות אותו
+    global _watcher
+    with _watcher_lock:
+        if _watcher is not None:
+            return _watcher
+        mode = mode or os.environ.get("CPI_WATCH", "auto")
+        if mode == "off":
+            return None
+        interval = interval or float(os.environ.get("CPI_WATCH_INTERVAL", DEFAULT_INTERVAL))
+        role = role or os.environ.get("CPI_WATCH_ROLE", "serve")
+        get_store()
+        watcher = StoreWatcher(mode=mode, interval=interval, role=role)
+        watcher.start()
+        set_watched(True)
+        _watcher = watcher
+        return _watcher
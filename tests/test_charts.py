@@ -0,0 +1,24 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from cpi.charts import build_time_series_chart
+from cpi.store import build_store
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+@pytest.fixture(scope="module")
+def store():
+    return build_store(DATA_DIR)
+
+
+@pytest.mark.parametrize("period", [(2025, 11), (2022, 6), (2020, 11), (2017, 8)])
+def test_time_series_axis_covers_the_window(store, period):
+    fig = build_time_series_chart(store, store.month_index(*period))
+    low, high = fig.layout.yaxis.range
+    values = np.concatenate([np.asarray(trace.y, dtype=float) for trace in fig.data])
+    values = values[~np.isnan(values)]
+    assert len(values)
+    assert low < values.min() and values.max() < high
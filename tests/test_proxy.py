@@ -0,0 +1,70 @@
+import gzip
+import shutil
+import tempfile
+from pathlib import Path
+
+import tornado.web
+from tornado.testing import AsyncHTTPTestCase
+
+from cpi import proxy
+from cpi.proxy import Pool, StaticAssetHandler, StreamProxy, Worker
+
+
+class FakeUpstream:
+    def close(self):
+        pass
+
+
+def open_session(worker):
+    # StreamProxy.open בלי tornado: מה שנשאר אחרי חיבור מוצלח לעובד
+    handler = StreamProxy.__new__(StreamProxy)
+    handler.worker = worker
+    handler.upstream = FakeUpstream()
+    worker.sessions += 1
+    handler.generation = worker.generation
+    return handler
+
+
+def test_session_from_before_a_restart_does_not_decrement(monkeypatch):
+    # Worker.start בלי להפעיל תהליך Streamlit
+    monkeypatch.setattr(proxy.subprocess, "Popen", lambda *args, **kwargs: None)
+    worker = Worker(0, 0, "app.py", [])
+    worker.start()
+    stale = open_session(worker)
+    worker.start()
+    worker.ready = True
+    fresh = open_session(worker)
+
+    stale.on_close()
+    assert worker.sessions == 1
+    fresh.on_close()
+    assert worker.sessions == 0
+    assert Pool([worker]).pick() is worker
+
+
+class PrecompressedStaticTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.static_dir = tempfile.mkdtemp()
+        self.body = b'{"key_metrics": {}}' * 100
+        Path(self.static_dir, "api.json").write_bytes(self.body)
+        Path(self.static_dir, "api.json.gz").write_bytes(gzip.compress(self.body, mtime=0))
+        return tornado.web.Application(
+            [(r"/app/static/(.*)", StaticAssetHandler, {"path": self.static_dir})], compress_response=True
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        shutil.rmtree(self.static_dir)
+
+    def test_gzip_client_gets_the_published_gz(self):
+        response = self.fetch("/app/static/api.json", headers={"Accept-Encoding": "gzip"}, decompress_response=False)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Content-Type"] == "application/json"
+        assert response.body == Path(self.static_dir, "api.json.gz").read_bytes()
+
+    def test_identity_client_gets_the_plain_file_with_another_etag(self):
+        plain = self.fetch("/app/static/api.json", headers={"Accept-Encoding": "identity"}, decompress_response=False)
+        encoded = self.fetch("/app/static/api.json", headers={"Accept-Encoding": "gzip"}, decompress_response=False)
+        assert "Content-Encoding" not in plain.headers
+        assert plain.body == self.body
+        assert plain.headers["ETag"] != encoded.headers["ETag"]
@@ -0,0 +1,45 @@
+import http.client
+import threading
+from pathlib import Path
+
+import pytest
+
+from cpi.server import make_server
+from cpi.store import build_store, swap_store
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+@pytest.fixture(scope="module")
+def port():
+    swap_store(build_store(DATA_DIR))
+    server = make_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def get(port, path, **headers):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request("GET", path, headers=headers)
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response
+
+
+def test_each_encoding_has_its_own_etag(port):
+    identity = get(port, "/api", **{"Accept-Encoding": "identity"})
+    encoded = get(port, "/api", **{"Accept-Encoding": "gzip"})
+    assert encoded.getheader("Content-Encoding") == "gzip"
+    assert identity.getheader("ETag") != encoded.getheader("ETag")
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+def test_either_etag_revalidates(port, encoding):
+    for source in ("identity", "gzip"):
+        etag = get(port, "/api", **{"Accept-Encoding": source}).getheader("ETag")
+        response = get(port, "/api", **{"Accept-Encoding": encoding, "If-None-Match": etag})
+        assert response.status == 304
+        assert response.getheader("ETag").endswith('-gz"') == (encoding == "gzip")
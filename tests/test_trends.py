@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from cpi.api import build_machine_ready_data
+from cpi.models import CoreTrend
+from cpi.store import build_store
+from cpi.trends import core_trend_rates, get_core_trend
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+@pytest.fixture(scope="module")
+def store():
+    return build_store(DATA_DIR)
+
+
+def test_latest_core_trend_is_the_published_figure(store):
+    assert get_core_trend(store) == CoreTrend(
+        without_housing=0.9,
+        without_housing_fruit_vegetables=1.5,
+        period="אוגוסט-נובמבר 2025",
+        window=3
+    )
+
+
+def test_api_reports_the_published_core_trend(store):
+    metrics = build_machine_ready_data(store)["key_metrics"]
+    assert metrics["core_trend_without_housing_percent"] == 0.9
+    assert metrics["core_trend_without_housing_vegetables_fruits_percent"] == 1.5
+    assert metrics["core_trend_period"] == "אוגוסט-נובמבר 2025"
+
+
+def test_month_without_a_published_figure_has_no_core_trend(store):
+    assert get_core_trend(store, store.month_index(2025, 10)) is None
+
+
+def test_computed_approximation_is_pinned(store):
+    # הקירוב לא מוצג, אבל שינוי בו צריך להיות מכוון
+    rates = core_trend_rates(store)
+    assert np.round(rates["without_housing"][:4], 1).tolist() == [-0.7, 2.2, 1.1, 4.8]
+    assert np.round(rates["without_housing_fruit_vegetables"][:4], 1).tolist() == [-0.7, 2.7, 1.8, 4.7]